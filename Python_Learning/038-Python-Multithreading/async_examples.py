@@ -0,0 +1,266 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# multithreading_examples.py starts one OS thread per task, and the tasks
+# only wait (time.sleep simulates I/O). Waiting does not need a thread:
+# asyncio runs thousands of coroutines on one thread, switching whenever one
+# of them awaits. The same examples with asyncio:
+#
+# - worker() awaits asyncio.sleep() instead of blocking in time.sleep().
+# - asyncio.TaskGroup replaces start()/join(): the group waits for all of its
+#   tasks, and cancels the rest if one of them fails.
+# - A background task stands in for the daemon thread: it is cancelled
+#   explicitly instead of being killed when the program exits.
+# - asyncio.Semaphore bounds concurrency the way max_workers bounds a pool.
+# - ExecutorBridge runs code that would block the event loop on a thread pool
+#   (blocking I/O, libraries without async support) or a process pool
+#   (CPU-bound work).
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(taskName)s - %(message)s')
+
+
+class _TaskNameFilter(logging.Filter):
+    """Adds %(taskName)s (built in from Python 3.12) to every record."""
+
+    def filter(self, record):
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        record.taskName = task.get_name() if task else threading.current_thread().name
+        return True
+
+
+for _handler in logging.getLogger().handlers:
+    _handler.addFilter(_TaskNameFilter())
+
+
+# 1. A coroutine instead of a thread function
+async def worker(name, delay):
+    logging.info(f"Starting task: {name}")
+    await asyncio.sleep(delay)
+    logging.info(f"Finished task: {name}")
+
+
+# 2. TaskGroup instead of start()/join()
+async def task_group_example():
+    logging.info("TaskGroup example starting.")
+    async with asyncio.TaskGroup() as group:
+        group.create_task(worker("Task-1", 2), name="Task-1")
+        group.create_task(worker("Task-2", 1), name="Task-2")
+    logging.info("All tasks in the group have finished.")
+
+
+# 3. A background task instead of a daemon thread
+async def background_task_example():
+    logging.info("Background task example starting.")
+    background = asyncio.create_task(worker("BackgroundTask", 5), name="BackgroundTask")
+    await asyncio.sleep(1)
+    background.cancel()  # explicit, unlike a daemon thread killed at exit
+    try:
+        await background
+    except asyncio.CancelledError:
+        logging.info("Background task was cancelled.")
+
+
+# 4. A semaphore instead of ThreadPoolExecutor(max_workers=3)
+async def bounded_example():
+    logging.info("Bounded concurrency example starting.")
+    limit = asyncio.Semaphore(3)
+
+    async def limited(name, delay):
+        async with limit:
+            await worker(name, delay)
+
+    tasks = [("Task A", 2), ("Task B", 3), ("Task C", 1), ("Task D", 4)]
+    async with asyncio.TaskGroup() as group:
+        for name, delay in tasks:
+            group.create_task(limited(name, delay), name=name)
+    logging.info("Bounded concurrency example finished.")
+
+
+# 5. Offloading blocking and CPU-bound calls
+class ExecutorBridge:
+    """
+    await bridge.run_blocking(fn, *args)  - on a thread pool (blocking I/O)
+    await bridge.run_cpu(fn, *args)       - on a process pool (CPU-bound work)
+    """
+
+    def __init__(self, threads=8, processes=None):
+        self._threads = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="bridge")
+        self._processes = None
+        self._process_count = processes
+
+    async def run_blocking(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._threads, fn, *args)
+
+    async def run_cpu(self, fn, *args):
+        if self._processes is None:  # started on first use: processes are expensive
+            self._processes = ProcessPoolExecutor(max_workers=self._process_count)
+        return await asyncio.get_running_loop().run_in_executor(self._processes, fn, *args)
+
+    def close(self):
+        self._threads.shutdown()
+        if self._processes is not None:
+            self._processes.shutdown()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
+
+
+def fib(n):
+    return n if n < 2 else fib(n - 1) + fib(n - 2)
+
+
+async def bridge_example():
+    logging.info("Executor bridge example starting.")
+    async with ExecutorBridge() as bridge:
+        # The event loop keeps running the ticker while both calls are in progress
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.1)
+                ticks += 1
+
+        tick_task = asyncio.create_task(ticker(), name="ticker")
+        await bridge.run_blocking(time.sleep, 1)
+        result = await bridge.run_cpu(fib, 27)
+        tick_task.cancel()
+    logging.info(f"fib(27) = {result}; the event loop ticked {ticks} times meanwhile.")
+
+
+# ==============================================================================
+# Benchmark: 10k concurrent tasks, threads vs. asyncio
+# ==============================================================================
+
+def _rss_kb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+
+
+def _threads_memory(n):
+    release = threading.Event()
+    before = _rss_kb()
+    threads = [threading.Thread(target=release.wait) for _ in range(n)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    started = time.perf_counter() - start
+    used = _rss_kb() - before
+    release.set()
+    for t in threads:
+        t.join()
+    return used, started
+
+
+def _asyncio_memory(n):
+    async def main():
+        release = asyncio.Event()
+        before = _rss_kb()
+        start = time.perf_counter()
+        tasks = [asyncio.create_task(release.wait()) for _ in range(n)]
+        await asyncio.sleep(0)  # let every task start and block
+        started = time.perf_counter() - start
+        used = _rss_kb() - before
+        release.set()
+        await asyncio.gather(*tasks)
+        return used, started
+    return asyncio.run(main())
+
+
+def _threads_switch(rounds):
+    """Two threads hand a token back and forth through Events."""
+    ping, pong = threading.Event(), threading.Event()
+
+    def other():
+        for _ in range(rounds):
+            ping.wait()
+            ping.clear()
+            pong.set()
+
+    t = threading.Thread(target=other)
+    t.start()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        ping.set()
+        pong.wait()
+        pong.clear()
+    elapsed = time.perf_counter() - start
+    t.join()
+    return elapsed / (2 * rounds)
+
+
+def _asyncio_switch(rounds):
+    """The same hand-off between two coroutines through asyncio.Events."""
+    async def main():
+        ping, pong = asyncio.Event(), asyncio.Event()
+
+        async def other():
+            for _ in range(rounds):
+                await ping.wait()
+                ping.clear()
+                pong.set()
+
+        task = asyncio.create_task(other())
+        start = time.perf_counter()
+        for _ in range(rounds):
+            ping.set()
+            await pong.wait()
+            pong.clear()
+        elapsed = time.perf_counter() - start
+        await task
+        return elapsed / (2 * rounds)
+    return asyncio.run(main())
+
+
+def benchmark(tasks=10_000, rounds=20_000):
+    # Each measurement runs in a fresh process so memory from one run does not
+    # hide the other's
+    def isolated(fn, arg):
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            return pool.submit(fn, arg).result()
+
+    print(f"{tasks:,} concurrent waiting tasks")
+    print(f"{'':<10} {'memory':>10} {'per task':>10} {'start all':>10}")
+    for name, fn in (("threads", _threads_memory), ("asyncio", _asyncio_memory)):
+        used, started = isolated(fn, tasks)
+        print(f"{name:<10} {used / 1024:8.1f}MB {used * 1024 / tasks:8.0f} B {started * 1000:8.0f}ms")
+
+    print(f"\nTask switch (ping-pong, {rounds:,} rounds)")
+    for name, fn in (("threads", _threads_switch), ("asyncio", _asyncio_switch)):
+        print(f"{name:<10} {isolated(fn, rounds) * 1e6:8.1f} us per switch")
+
+
+async def main():
+    asyncio.current_task().set_name("MainTask")  # like threading's MainThread
+    print("--- TaskGroup Example ---")
+    await task_group_example()
+    print("\n" + "=" * 40 + "\n")
+
+    print("--- Background Task Example ---")
+    await background_task_example()
+    print("\n" + "=" * 40 + "\n")
+
+    print("--- Bounded Concurrency Example ---")
+    await bounded_example()
+    print("\n" + "=" * 40 + "\n")
+
+    print("--- Executor Bridge Example ---")
+    await bridge_example()
+    print("\n" + "=" * 40 + "\n")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
+    benchmark()
@@ -0,0 +1,208 @@
+import math
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# thread_pool_example() uses ThreadPoolExecutor(max_workers=3). For bursty
+# I/O-bound work any fixed size is wrong part of the time: during a burst
+# three threads leave tasks waiting in the queue, and a pool sized for the
+# burst keeps dozens of idle threads around the rest of the time.
+#
+# ElasticThreadPool sizes itself. A controller thread checks every
+# `check_interval` seconds:
+# - Grow when tasks are queued and the oldest one has waited longer than
+#   `target_wait`, adding enough workers for the backlog (up to max_workers).
+# - Shrink when the queue is empty, retiring half of the idle workers at a
+#   time, down to min_workers.
+# - Cooldowns stop it from flapping: no growth within `scale_up_cooldown`
+#   seconds of the last change, no shrinking within `scale_down_cooldown`.
+# metrics() reports workers, queue length and recent task wait times.
+
+_RETIRE = object()
+
+
+class ElasticThreadPool:
+    def __init__(self, min_workers=1, max_workers=32, target_wait=0.05, check_interval=0.02,
+                 scale_up_cooldown=0.05, scale_down_cooldown=1.0, name="Elastic"):
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+        self.target_wait = target_wait
+        self.check_interval = check_interval
+        self.scale_up_cooldown = scale_up_cooldown
+        self.scale_down_cooldown = scale_down_cooldown
+        self.name = name
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._workers = set()
+        self._idle = 0
+        self._counter = 0
+        self._waits = deque(maxlen=1000)  # queue wait of recently started tasks
+        self._last_change = 0.0
+        self._shutdown = threading.Event()
+        self.stats = {'submitted': 0, 'completed': 0, 'scale_ups': 0, 'scale_downs': 0, 'peak_workers': 0}
+        with self._lock:
+            for _ in range(min_workers):
+                self._start_worker()
+        self._controller = threading.Thread(target=self._control, name=f"{name}-controller", daemon=True)
+        self._controller.start()
+
+    # ---- tasks -----------------------------------------------------------
+
+    def submit(self, fn, *args, **kwargs):
+        if self._shutdown.is_set():
+            raise RuntimeError("cannot submit after shutdown")
+        future = Future()
+        self._queue.put((future, fn, args, kwargs, time.monotonic()))
+        with self._lock:
+            self.stats['submitted'] += 1
+        return future
+
+    def map(self, fn, *iterables):
+        """Like Executor.map: results in input order."""
+        futures = [self.submit(fn, *args) for args in zip(*iterables)]
+        return (f.result() for f in futures)
+
+    def _work(self):
+        while True:
+            with self._lock:
+                self._idle += 1
+            item = self._queue.get()
+            with self._lock:
+                self._idle -= 1
+            if item is _RETIRE:
+                with self._lock:
+                    self._workers.discard(threading.current_thread())
+                return
+            future, fn, args, kwargs, queued_at = item
+            self._waits.append(time.monotonic() - queued_at)
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn(*args, **kwargs))
+                except BaseException as e:
+                    future.set_exception(e)
+            with self._lock:
+                self.stats['completed'] += 1
+
+    def _start_worker(self):
+        """Called with self._lock held."""
+        self._counter += 1
+        worker = threading.Thread(target=self._work, name=f"{self.name}-{self._counter}", daemon=True)
+        self._workers.add(worker)
+        worker.start()
+        self.stats['peak_workers'] = max(self.stats['peak_workers'], len(self._workers))
+
+    # ---- scaling ---------------------------------------------------------
+
+    def _oldest_wait(self):
+        with self._queue.mutex:
+            head = self._queue.queue[0] if self._queue.queue else None
+        if head is None or head is _RETIRE:
+            return 0.0
+        return time.monotonic() - head[4]
+
+    def _control(self):
+        while not self._shutdown.wait(self.check_interval):
+            now = time.monotonic()
+            depth = self._queue.qsize()
+            oldest = self._oldest_wait()
+            with self._lock:
+                workers, idle = len(self._workers), self._idle
+                since_change = now - self._last_change
+                if (depth and oldest > self.target_wait and workers < self.max_workers
+                        and since_change >= self.scale_up_cooldown):
+                    # Enough workers to clear the backlog that idle ones cannot take
+                    grow = min(self.max_workers - workers, max(1, depth - idle))
+                    for _ in range(grow):
+                        self._start_worker()
+                    self._last_change = now
+                    self.stats['scale_ups'] += 1
+                elif (not depth and idle and workers > self.min_workers
+                        and since_change >= self.scale_down_cooldown):
+                    # Retire half of the idle surplus at a time
+                    for _ in range(max(1, min(idle, workers - self.min_workers) // 2)):
+                        self._queue.put(_RETIRE)
+                    self._last_change = now
+                    self.stats['scale_downs'] += 1
+
+    def metrics(self):
+        waits = sorted(self._waits)
+        with self._lock:
+            workers, idle = len(self._workers), self._idle
+        return {
+            'workers': workers,
+            'idle_workers': idle,
+            'queue_length': self._queue.qsize(),
+            'oldest_wait_ms': self._oldest_wait() * 1000,
+            'wait_p50_ms': waits[len(waits) // 2] * 1000 if waits else 0.0,
+            'wait_p95_ms': waits[min(len(waits) - 1, math.ceil(len(waits) * 0.95) - 1)] * 1000 if waits else 0.0,
+            **self.stats,
+        }
+
+    def shutdown(self, wait=True):
+        self._shutdown.set()
+        self._controller.join()
+        with self._lock:
+            workers = list(self._workers)
+        for _ in workers:
+            self._queue.put(_RETIRE)  # queued tasks run first: the queue is FIFO
+        if wait:
+            for worker in workers:
+                worker.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+
+# ==============================================================================
+# Benchmark: bursts of I/O-bound tasks separated by quiet periods
+# ==============================================================================
+
+def benchmark(bursts=4, burst_size=200, io_time=0.02, gap=0.5):
+    """
+    Per-task latency (submit to result) and the threads each pool kept alive.
+    """
+    def run(pool, threads_now):
+        latencies, samples = [], []
+        sampling = threading.Event()
+
+        def sample():
+            while not sampling.wait(0.01):
+                samples.append(threads_now())
+
+        sampler = threading.Thread(target=sample)
+        sampler.start()
+        for _ in range(bursts):
+            start = time.monotonic()
+            futures = [pool.submit(time.sleep, io_time) for _ in range(burst_size)]
+            for f in futures:
+                f.add_done_callback(lambda _, start=start: latencies.append(time.monotonic() - start))
+            for f in futures:
+                f.result()
+            time.sleep(gap)
+        sampling.set()
+        sampler.join()
+        latencies.sort()
+        return (latencies[len(latencies) // 2] * 1000, latencies[int(len(latencies) * 0.95)] * 1000,
+                sum(samples) / len(samples), max(samples))
+
+    print(f"{bursts} bursts of {burst_size} x {io_time * 1000:.0f} ms tasks, {gap * 1000:.0f} ms apart")
+    print(f"{'pool':<26} {'p50 ms':>8} {'p95 ms':>8} {'avg threads':>12} {'max threads':>12}")
+    for size in (3, 64):
+        with ThreadPoolExecutor(max_workers=size) as pool:
+            result = run(pool, lambda pool=pool: len(pool._threads))
+        print(f"{'ThreadPoolExecutor(' + str(size) + ')':<26} {result[0]:8.1f} {result[1]:8.1f} "
+              f"{result[2]:12.1f} {result[3]:12d}")
+    with ElasticThreadPool(min_workers=1, max_workers=64, scale_down_cooldown=0.02) as pool:
+        result = run(pool, lambda: pool.metrics()['workers'])
+        metrics = pool.metrics()
+    print(f"{'ElasticThreadPool(1-64)':<26} {result[0]:8.1f} {result[1]:8.1f} {result[2]:12.1f} {result[3]:12d}")
+    print("elastic metrics:", {k: round(v, 1) for k, v in metrics.items()})
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -1,7 +1,9 @@
 import threading
 import time
 import logging
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from work_stealing_pool import WorkStealingPool
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(threadName)s - %(message)s')
@@ -101,12 +103,28 @@ def thread_pool_example():
         # Submit tasks to the thread pool
         futures = [executor.submit(worker, name, delay) for name, delay in tasks]
         
-        # Wait for all tasks to complete
-        for future in futures:
+        # Handle each task as soon as it finishes, not in submission order,
+        # so the slow Task D does not hold up the results of the others
+        for future in as_completed(futures):
             future.result() # Calling result() will re-raise exceptions if any occurred
             
     logging.info("Thread pool example finished.")
 
+# 8. Work-Stealing Thread Pool with Priorities
+def work_stealing_pool_example():
+    logging.info("Work-stealing pool example starting.")
+
+    with WorkStealingPool(max_workers=3) as pool:
+        tasks = [("Task A", 2, 1), ("Task B", 3, 2), ("Task C", 1, 0), ("Task D", 4, 2)]
+
+        # Lower number = more urgent; idle workers steal from busy ones
+        futures = [pool.submit(worker, name, delay, priority=priority) for name, delay, priority in tasks]
+
+        for future in as_completed(futures):
+            future.result()
+
+    logging.info(f"Work-stealing pool example finished ({pool.stolen} tasks stolen).")
+
 
 if __name__ == "__main__":
     print("--- Main Thread and Joining Example ---")
@@ -127,3 +145,7 @@ if __name__ == "__main__":
     print("--- Thread Pool Example ---")
     thread_pool_example()
     print("\n" + "="*40 + "\n")
+
+    print("--- Work-Stealing Pool Example ---")
+    work_stealing_pool_example()
+    print("\n" + "="*40 + "\n")
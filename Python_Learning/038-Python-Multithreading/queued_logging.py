@@ -0,0 +1,268 @@
+import atexit
+import copy
+import logging
+import logging.handlers
+import os
+import queue
+import tempfile
+import threading
+import time
+
+# multithreading_examples.py logs through logging.basicConfig(), whose
+# StreamHandler formats and writes every record on the calling thread while
+# holding the handler lock. Every worker that logs waits for the others'
+# I/O.
+#
+# setup_queued_logging() moves the I/O off the worker threads:
+# - Workers only put the record into a bounded queue (BoundedQueueHandler).
+# - One listener thread (BatchingQueueListener) takes records off the queue in
+#   batches and writes each batch with a single write() + flush().
+# - When the queue is full the policy decides: 'block' waits for room (no
+#   record is lost), 'drop' discards the record and counts it, so a burst of
+#   logging can never stall the workers.
+# - listener.stop() (also registered with atexit) drains the queue and
+#   flushes before returning, and reports how many records were dropped.
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    def __init__(self, capacity=10000, policy='drop'):
+        if policy not in ('drop', 'block'):
+            raise ValueError("policy must be 'drop' or 'block'")
+        super().__init__(queue.Queue(maxsize=capacity))
+        self.policy = policy
+        self.dropped = 0
+
+    def prepare(self, record):
+        # QueueHandler.prepare() fully formats the record on the worker thread
+        # (and the listener formats it again). Only merge the arguments here,
+        # as they may change after the call; formatting is the listener's job.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        if self.policy == 'block':
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1  # approximate under contention; it is a statistic
+
+
+class BatchingQueueListener(logging.handlers.QueueListener):
+    def __init__(self, queue, *handlers, batch_size=256):
+        super().__init__(queue, *handlers, respect_handler_level=True)
+        self.batch_size = batch_size
+        self.batches = 0
+
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)  # the queue may be full: wait for room
+
+    def _monitor(self):
+        q = self.queue
+        while True:
+            batch, stop = [q.get()], False
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(q.get_nowait())
+                except queue.Empty:
+                    break
+            if self._sentinel in batch:
+                stop = True
+                batch = [r for r in batch if r is not self._sentinel]
+            if batch:
+                self.handle_batch(batch)
+            for _ in range(len(batch) + stop):
+                q.task_done()
+            if stop:
+                return
+
+    def handle_batch(self, records):
+        """Format a batch and write it to each handler's stream in one call."""
+        self.batches += 1
+        for handler in self.handlers:
+            selected = [r for r in records if r.levelno >= handler.level and handler.filter(r)]
+            if not selected:
+                continue
+            if isinstance(handler, logging.StreamHandler):
+                # Errors go to handleError() as in Handler.handle(): a failing
+                # stream must not kill the listener, or with policy='block'
+                # every worker would hang once the queue fills up.
+                lines = []
+                for record in selected:
+                    try:
+                        lines.append(handler.format(record) + handler.terminator)
+                    except Exception:
+                        handler.handleError(record)
+                try:
+                    with handler.lock:
+                        handler.stream.write(''.join(lines))
+                        handler.flush()
+                except Exception:
+                    handler.handleError(selected[-1])  # once per failed batch
+            else:
+                for record in selected:
+                    handler.handle(record)
+
+
+class QueuedLogging:
+    """Returned by setup_queued_logging(); call stop() before exiting."""
+
+    def __init__(self, handler, listener, previous_handlers=(), previous_level=logging.WARNING):
+        self.handler = handler
+        self.listener = listener
+        self._previous_handlers = list(previous_handlers)
+        self._previous_level = previous_level
+        self._stopped = False
+
+    @property
+    def dropped(self):
+        return self.handler.dropped
+
+    def stop(self):
+        """
+        Write out everything still queued, then stop the listener thread and
+        give the root logger back its previous handlers and level. Without
+        that, later log calls would still go into the queue, which nothing
+        empties any more: with policy='block' they would hang once it is full.
+        """
+        if self._stopped:
+            return
+        self._stopped = True
+        root = logging.getLogger()
+        root.removeHandler(self.handler)
+        for old in self._previous_handlers:
+            root.addHandler(old)
+        root.setLevel(self._previous_level)
+        self.listener.stop()
+        if self.handler.dropped:
+            record = logging.LogRecord("queued_logging", logging.WARNING, __file__, 0,
+                                       "%d log records were dropped (queue full)",
+                                       (self.handler.dropped,), None)
+            self.listener.handle_batch([record])
+        for handler in self.listener.handlers:
+            handler.flush()
+            handler.close()
+
+
+def setup_queued_logging(level=logging.INFO, fmt='%(asctime)s - %(threadName)s - %(message)s',
+                         stream=None, filename=None, capacity=10000, policy='drop', batch_size=256):
+    """
+    A drop-in replacement for logging.basicConfig(level=..., format=...):
+    the root logger gets a BoundedQueueHandler, and a BatchingQueueListener
+    writes to `filename` (or `stream`, default stderr).
+    """
+    target = logging.FileHandler(filename) if filename else logging.StreamHandler(stream)
+    target.setFormatter(logging.Formatter(fmt))
+    handler = BoundedQueueHandler(capacity, policy)
+    listener = BatchingQueueListener(handler.queue, target, batch_size=batch_size)
+
+    root = logging.getLogger()
+    previous_handlers, previous_level = root.handlers[:], root.level
+    for old in previous_handlers:
+        root.removeHandler(old)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    listener.start()
+    queued = QueuedLogging(handler, listener, previous_handlers, previous_level)
+    atexit.register(queued.stop)
+    return queued
+
+
+# ==============================================================================
+# Benchmark: worker throughput with logging off, synchronous and queued
+# ==============================================================================
+
+class SlowStream:
+    """A file-like sink where every write() costs `latency` seconds (slow disk, pipe, network)."""
+
+    def __init__(self, latency=0.0005):
+        self.latency = latency
+        self.lines = 0
+
+    def write(self, text):
+        time.sleep(self.latency)
+        self.lines += text.count('\n')
+
+    def flush(self):
+        pass
+
+
+def benchmark(threads=8, iterations=20000, slow_iterations=1000):
+    def run(iterations):
+        def worker():
+            log = logging.getLogger("bench")
+            for i in range(iterations):
+                log.info("processed item %d", i)
+
+        workers = [threading.Thread(target=worker, name=f"Worker-{n}") for n in range(threads)]
+        start = time.perf_counter()
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        return time.perf_counter() - start
+
+    def row(label, calls, elapsed, flushed, written, note=""):
+        print(f"{label:<22} {elapsed:12.2f}s {flushed:11.2f}s {calls / elapsed:12,.0f} {written:>8}  {note}".rstrip())
+
+    root = logging.getLogger()
+    fmt = logging.Formatter('%(asctime)s - %(threadName)s - %(message)s')
+    with tempfile.TemporaryDirectory() as tmp:
+        for sink, iters in (("a file", iterations), ("a slow stream (0.5 ms per write)", slow_iterations)):
+            calls = threads * iters
+
+            def make_sink(name):
+                if iters == slow_iterations:
+                    stream = SlowStream()
+                    return logging.StreamHandler(stream), lambda: stream.lines
+                path = os.path.join(tmp, name)
+
+                def count():
+                    with open(path) as f:
+                        return sum(1 for _ in f)
+                return logging.FileHandler(path), count
+
+            print(f"\n{threads} threads x {iters} log calls, writing to {sink}")
+            print(f"{'setup':<22} {'workers done':>13} {'incl. flush':>12} {'calls/s':>12} {'lines':>8}")
+            root.handlers.clear()
+            root.setLevel(logging.WARNING)  # logging off: info() returns at once
+            elapsed = run(iters)
+            row("logging off", calls, elapsed, elapsed, 0)
+
+            handler, written = make_sink("sync.log")
+            handler.setFormatter(fmt)
+            root.handlers[:] = [handler]
+            root.setLevel(logging.INFO)
+            elapsed = run(iters)
+            handler.close()
+            row("handler (sync)", calls, elapsed, elapsed, written())
+
+            for policy in ('block', 'drop'):
+                handler, written = make_sink(f"{policy}.log")
+                handler.setFormatter(fmt)
+                queued = setup_queued_logging(capacity=10000, policy=policy)
+                queued.listener.handlers = (handler,)  # same sink as the sync run
+                elapsed = run(iters)
+                start = time.perf_counter()
+                queued.stop()
+                flushed = elapsed + time.perf_counter() - start
+                handler.close()
+                row(f"queued, {policy}", calls, elapsed, flushed, written(),
+                    f"({queued.dropped} dropped, {queued.listener.batches} batches)")
+        root.handlers.clear()
+
+
+if __name__ == "__main__":
+    queued = setup_queued_logging()
+    threads = [threading.Thread(target=lambda n=n: logging.info("hello from worker %d", n), name=f"Worker-{n}")
+               for n in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    queued.stop()
+    benchmark()
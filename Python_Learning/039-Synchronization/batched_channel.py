@@ -0,0 +1,209 @@
+import queue
+import threading
+import time
+from collections import deque
+
+# inter_thread_communication_example.py moves one item at a time through a
+# queue.Queue and ends with a single None sentinel, so it supports exactly
+# one consumer, and every item pays for a lock round trip and a condition
+# variable wake-up.
+#
+# Channel is a bounded queue built for many producers and many consumers:
+# - put_many()/get_many() move a whole batch under one lock acquisition.
+# - It is bounded: producers block when it is full (backpressure), so a
+#   fast producer cannot run the process out of memory.
+# - Close semantics: Channel(producers=N) closes itself after all N
+#   producers call producer_done(). Consumers drain what is left and then
+#   get ChannelClosed, so no sentinel values are needed.
+
+
+class ChannelClosed(Exception):
+    """Raised by put on a closed channel, and by get once it is closed and empty."""
+
+
+class Channel:
+    def __init__(self, capacity=1024, producers=1):
+        self.capacity = capacity
+        self._items = deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+        self._open_producers = producers
+        self._closed = False
+
+    # ---- producers -------------------------------------------------------
+
+    def put(self, item, timeout=None):
+        self.put_many((item,), timeout)
+
+    def put_many(self, items, timeout=None):
+        """
+        Add all `items`, blocking while the channel is full. Large batches go
+        in as space frees up. Raises queue.Full on timeout (items added
+        before the timeout stay in the channel).
+        """
+        items = list(items)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        start = 0
+        with self._not_full:
+            while start < len(items):
+                if self._closed:
+                    raise ChannelClosed("put on a closed channel")
+                room = self.capacity - len(self._items)
+                if room <= 0:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise queue.Full
+                    self._not_full.wait(remaining)
+                    continue
+                chunk = items[start:start + room]
+                self._items.extend(chunk)
+                start += len(chunk)
+                self._not_empty.notify(len(chunk))
+
+    def producer_done(self):
+        """Called once by each producer; the last one closes the channel."""
+        with self._lock:
+            self._open_producers -= 1
+            if self._open_producers <= 0:
+                self._close()
+
+    def close(self):
+        """Close now, whatever the producer count."""
+        with self._lock:
+            self._close()
+
+    def _close(self):
+        self._closed = True
+        self._not_empty.notify_all()
+        self._not_full.notify_all()
+
+    # ---- consumers -------------------------------------------------------
+
+    def get(self, timeout=None):
+        return self.get_many(1, timeout)[0]
+
+    def get_many(self, max_items=256, timeout=None):
+        """
+        Return between 1 and `max_items` items, waiting for at least one.
+        Raises queue.Empty on timeout and ChannelClosed once the channel
+        is closed and drained.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._not_empty:
+            while not self._items:
+                if self._closed:
+                    raise ChannelClosed("channel is closed and empty")
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise queue.Empty
+                self._not_empty.wait(remaining)
+            count = min(max_items, len(self._items))
+            popleft = self._items.popleft
+            batch = [popleft() for _ in range(count)]
+            self._not_full.notify(count)
+            return batch
+
+    def batches(self, max_items=256):
+        """Iterate over batches until the channel is closed and drained."""
+        while True:
+            try:
+                yield self.get_many(max_items)
+            except ChannelClosed:
+                return
+
+    def __len__(self):
+        return len(self._items)
+
+    @property
+    def closed(self):
+        return self._closed
+
+
+def benchmark(items=400_000, producers=4, consumers=4, batch=256):
+    """Items/sec for queue.Queue (one at a time, sentinels) vs. Channel batches."""
+    per_producer = items // producers
+
+    def run(producer, consumer):
+        threads = [threading.Thread(target=producer) for _ in range(producers)]
+        threads += [threading.Thread(target=consumer) for _ in range(consumers)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return per_producer * producers / (time.perf_counter() - start)
+
+    # queue.Queue: one item per put/get, one sentinel per consumer
+    q = queue.Queue(maxsize=1024)
+    done = threading.Barrier(producers, action=lambda: [q.put(None) for _ in range(consumers)])
+
+    def q_producer():
+        for i in range(per_producer):
+            q.put(i)
+        done.wait()
+
+    def q_consumer():
+        while q.get() is not None:
+            pass
+
+    # Channel: batches in, batches out, closed by the last producer
+    ch = Channel(capacity=1024, producers=producers)
+
+    def ch_producer():
+        for start in range(0, per_producer, batch):
+            ch.put_many(range(start, min(start + batch, per_producer)))
+        ch.producer_done()
+
+    def ch_consumer():
+        for _ in ch.batches(batch):
+            pass
+
+    # Channel used one item at a time, to separate batching from the rest
+    single = Channel(capacity=1024, producers=producers)
+
+    def single_producer():
+        for i in range(per_producer):
+            single.put(i)
+        single.producer_done()
+
+    def single_consumer():
+        try:
+            while True:
+                single.get()
+        except ChannelClosed:
+            pass
+
+    print(f"{producers} producers, {consumers} consumers, {per_producer * producers} items")
+    print(f"queue.Queue         : {run(q_producer, q_consumer):>12,.0f} items/s")
+    print(f"Channel (per item)  : {run(single_producer, single_consumer):>12,.0f} items/s")
+    print(f"Channel (batch {batch}): {run(ch_producer, ch_consumer):>12,.0f} items/s")
+
+
+def producer(ch, name):
+    for i in range(5):
+        print(f"{name}: producing item {i}")
+        ch.put(f"{name}-{i}")
+        time.sleep(0.1)
+    ch.producer_done()
+
+
+def consumer(ch, name):
+    for batch in ch.batches(max_items=3):
+        print(f"{name}: consuming {batch}")
+        time.sleep(0.2)
+    print(f"{name}: channel closed, exiting")
+
+
+if __name__ == "__main__":
+    # Two producers, three consumers, no sentinel values
+    ch = Channel(capacity=4, producers=2)
+    threads = [threading.Thread(target=producer, args=(ch, f"P{i}")) for i in range(2)]
+    threads += [threading.Thread(target=consumer, args=(ch, f"C{i}")) for i in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    print("Main thread finished.")
+    print()
+    benchmark()
@@ -0,0 +1,274 @@
+import queue
+import random
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+# interrupting_thread_example.py checks its stop_event only between
+# time.sleep(1) calls, so a worker can take up to a whole second to notice it
+# was asked to stop, and nothing stops the work it started on other threads.
+#
+# A CancellationToken generalizes that stop_event:
+# - wait(timeout)/sleep(seconds) are built on Event.wait(), so they return
+#   the moment the token is cancelled instead of finishing the sleep.
+# - Tokens form a tree: child() makes a token that is cancelled together with
+#   its parent (but can also be cancelled on its own), so cancelling a request
+#   cancels every task it started.
+# - A token can have a deadline; a child never outlives its parent's deadline.
+# - on_cancel() callbacks wake up code that waits on something else, such as
+#   a queue consumer blocked in get() or a future still sitting in a pool.
+
+
+class Cancelled(Exception):
+    """Raised by check(), sleep() and queue_get() once the token is cancelled."""
+
+
+class CancellationToken:
+    def __init__(self, parent=None, timeout=None, name=None):
+        self.name = name
+        self.reason = None
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks = []
+        self._children = weakref.WeakSet()
+        self._queues = weakref.WeakSet()  # queues queue_get() will wake on cancel
+        self._waiting = {}  # queue -> number of consumers blocked in queue_get()
+        self.deadline = None if timeout is None else time.monotonic() + timeout
+        if parent is not None:
+            if parent.deadline is not None and (self.deadline is None or parent.deadline < self.deadline):
+                self.deadline = parent.deadline
+            parent._adopt(self)
+
+    def _adopt(self, child):
+        with self._lock:
+            if not self._event.is_set():
+                self._children.add(child)
+                return
+        child.cancel(self.reason)
+
+    def child(self, timeout=None, name=None):
+        """A token cancelled with this one, optionally with a shorter deadline."""
+        return CancellationToken(self, timeout, name)
+
+    def cancel(self, reason="cancelled"):
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+            children = list(self._children)
+        for child in children:
+            child.cancel(reason)
+        for callback in callbacks:
+            callback()
+
+    def on_cancel(self, callback):
+        """Call `callback()` when the token is cancelled (at once if it already is)."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def remaining(self):
+        """Seconds until the deadline, or None if there is none."""
+        return None if self.deadline is None else max(0.0, self.deadline - time.monotonic())
+
+    @property
+    def cancelled(self):
+        if not self._event.is_set() and self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel("deadline exceeded")
+        return self._event.is_set()
+
+    def wait(self, timeout=None):
+        """
+        Block until the token is cancelled or `timeout` seconds pass.
+        Returns True if it was cancelled. The deadline is honoured even
+        if nobody calls cancel().
+        """
+        remaining = self.remaining()
+        if remaining is not None and (timeout is None or remaining <= timeout):
+            if not self._event.wait(remaining):
+                self.cancel("deadline exceeded")
+            return True
+        return self._event.wait(timeout)
+
+    def check(self):
+        """Raise Cancelled if the token has been cancelled."""
+        if self.cancelled:
+            raise Cancelled(self.reason)
+
+    def sleep(self, seconds):
+        """time.sleep() that raises Cancelled as soon as the token is cancelled."""
+        if self.wait(seconds):
+            raise Cancelled(self.reason)
+
+
+# ==============================================================================
+# Thread pool and queue integration
+# ==============================================================================
+
+def submit(executor, token, fn, *args, **kwargs):
+    """
+    executor.submit(fn, child_token, *args, **kwargs): the task gets its own
+    child token, and if `token` is cancelled before the task starts, the
+    future is cancelled instead of running at all.
+    """
+    child = token.child()
+    future = executor.submit(fn, child, *args, **kwargs)
+    child.on_cancel(future.cancel)
+    return future
+
+
+class _Wake:
+    """Wake-up marker for one consumer of `token` blocked in queue_get()."""
+    __slots__ = ('token',)
+
+    def __init__(self, token):
+        self.token = token
+
+
+def _waiters(token, q, change=0):
+    with token._lock:
+        count = token._waiting.get(q, 0) + change
+        if count:
+            token._waiting[q] = count
+        else:
+            token._waiting.pop(q, None)
+        return count
+
+
+def queue_get(q, token):
+    """
+    q.get() that raises Cancelled as soon as `token` is cancelled or its
+    deadline passes. On cancel, one wake-up marker per blocked consumer of the
+    token is put into the queue. A consumer that receives another token's
+    marker passes it on while that token still has a consumer waiting, and
+    drops it otherwise, so no stale markers stay behind.
+    """
+    if q not in token._queues:
+        token._queues.add(q)
+        token.on_cancel(lambda: _wake_waiters(q, token))
+    # Counted before the check: a cancel() from now on sees this consumer
+    _waiters(token, q, +1)
+    try:
+        while True:
+            token.check()
+            try:
+                item = q.get(timeout=token.remaining())
+            except queue.Empty:
+                if token.remaining() == 0:
+                    break
+                continue
+            if not isinstance(item, _Wake):
+                return item
+            if item.token is token:
+                raise Cancelled(token.reason)
+            if _waiters(item.token, q):
+                _put_wake(q, item)
+                time.sleep(0.001)  # let a consumer of that token take it
+    finally:
+        _waiters(token, q, -1)
+    # The deadline passed. No longer counted as waiting, so the cancel that
+    # check() triggers puts no marker in the queue for this consumer.
+    token.check()
+
+
+def _wake_waiters(q, token):
+    for _ in range(_waiters(token, q)):
+        _put_wake(q, _Wake(token))
+
+
+def _put_wake(q, marker):
+    try:
+        q.put_nowait(marker)
+    except queue.Full:
+        pass  # consumers are not blocked on an empty queue; they check the token
+
+
+def consume(q, handler, token):
+    """Call handler(item) for each queued item until the token is cancelled."""
+    handled = 0
+    try:
+        while True:
+            handler(queue_get(q, token))
+            handled += 1
+    except Cancelled:
+        return handled
+
+
+# ==============================================================================
+# Stop latency: time from cancel() to the worker having stopped
+# ==============================================================================
+
+def sleeping_task(stop_event):
+    """The loop from interrupting_thread_example.py, before the fix."""
+    while not stop_event.is_set():
+        time.sleep(1)
+
+
+def token_task(token):
+    try:
+        while True:
+            token.sleep(1)
+    except Cancelled:
+        pass
+
+
+def measure_stop_latency(trials=5):
+    def stop(start_worker, cancel):
+        done = threading.Event()
+        start_worker(done)
+        time.sleep(random.uniform(0.05, 0.5))
+        start = time.perf_counter()
+        cancel()
+        done.wait()
+        return (time.perf_counter() - start) * 1000
+
+    def report(name, samples):
+        print(f"{name:<36} mean {sum(samples) / len(samples):7.1f} ms   max {max(samples):7.1f} ms")
+
+    def in_thread(target, *args):
+        def start_worker(done):
+            threading.Thread(target=lambda: (target(*args), done.set())).start()
+        return start_worker
+
+    samples = []
+    for _ in range(trials):
+        event = threading.Event()
+        samples.append(stop(in_thread(sleeping_task, event), event.set))
+    report("stop_event + time.sleep(1)", samples)
+
+    samples = []
+    for _ in range(trials):
+        token = CancellationToken()
+        samples.append(stop(in_thread(token_task, token), token.cancel))
+    report("CancellationToken.sleep(1)", samples)
+
+    # A parent token cancels four pool tasks and one queue consumer at once
+    samples = []
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        for _ in range(trials):
+            root = CancellationToken(name="request")
+            q = queue.Queue()
+            futures = [submit(pool, root, token_task) for _ in range(4)]
+            consumer = in_thread(consume, q, lambda item: None, root.child())
+
+            def cancel_and_join():
+                root.cancel()
+                for f in futures:
+                    f.result()
+            samples.append(stop(consumer, cancel_and_join))
+    report("token tree: 4 pool tasks + consumer", samples)
+
+    token = CancellationToken(timeout=0.2)
+    start = time.perf_counter()
+    token.wait()
+    print(f"{'deadline of 200 ms':<36} fired after {(time.perf_counter() - start) * 1000:.1f} ms "
+          f"({token.reason})")
+
+
+if __name__ == "__main__":
+    measure_stop_latency()
@@ -4,7 +4,9 @@ import time
 def interruptible_task(stop_event):
     while not stop_event.is_set():
         print("Worker thread is running...")
-        time.sleep(1)
+        # Unlike time.sleep(1), wait() returns as soon as the event is set,
+        # so the worker stops right away (see cancellation.py)
+        stop_event.wait(1)
     print("Worker thread is stopping.")
 
 if __name__ == "__main__":
@@ -0,0 +1,245 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# deadlock_example.py shows a lock-order inversion: thread 1 takes lock1 then
+# lock2, thread 2 takes lock2 then lock1. In a real program the two halves
+# are far apart and the deadlock only happens under unlucky timing.
+#
+# This module provides drop-in Lock/RLock wrappers that record:
+# - wait time (how long acquire() blocked) and hold time per lock,
+# - the call sites that acquire each lock,
+# - a lock-order graph: an edge A -> B every time B is acquired while A is
+#   held. A cycle in that graph is a potential deadlock, even if the unlucky
+#   timing never happened during the run.
+#
+# The off switch costs nothing: when profiling is disabled, make_lock() and
+# make_rlock() return plain threading.Lock/RLock objects.
+# Enable with LOCK_PROFILING=1 in the environment or enable() before the
+# locks are created.
+
+_enabled = os.environ.get('LOCK_PROFILING') == '1'
+_registry = []  # every InstrumentedLock created
+_registry_lock = threading.Lock()  # guards _registry and _order_edges
+_order_edges = {}  # (held name, acquired name) -> first call site seen
+_held = threading.local()  # per-thread stack of held instrumented locks
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def make_lock(name=None):
+    """A threading.Lock, instrumented if profiling is enabled."""
+    return InstrumentedLock(threading.Lock(), name) if _enabled else threading.Lock()
+
+
+def make_rlock(name=None):
+    """A threading.RLock, instrumented if profiling is enabled."""
+    return InstrumentedLock(threading.RLock(), name, reentrant=True) if _enabled else threading.RLock()
+
+
+def _call_site():
+    """file:line of the first caller outside this module."""
+    frame = sys._getframe(1)
+    while frame.f_back is not None and frame.f_code in _INTERNAL_CODE:
+        frame = frame.f_back
+    return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno} in {frame.f_code.co_name}"
+
+
+class InstrumentedLock:
+    def __init__(self, lock, name=None, reentrant=False):
+        self._lock = lock
+        self._reentrant = reentrant
+        self._depth = 0  # recursion depth for RLock; only the outermost level is timed
+        self._acquired_at = 0.0
+        self.name = name or f"lock@{_call_site()}"
+        self.acquisitions = 0
+        self.contended = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_hold = 0.0
+        self.max_hold = 0.0
+        self.call_sites = Counter()
+        with _registry_lock:
+            _registry.append(self)
+
+    def acquire(self, blocking=True, timeout=-1):
+        # Fast path: an uncontended lock costs one non-blocking attempt.
+        if self._lock.acquire(False):
+            wait = 0.0
+        elif not blocking:
+            return False
+        else:
+            start = time.perf_counter()
+            if not self._lock.acquire(True, timeout):
+                return False
+            wait = time.perf_counter() - start
+            self.contended += 1
+
+        if self._reentrant:
+            self._depth += 1
+            if self._depth > 1:
+                return True
+
+        site = _call_site()
+        stack = _held.__dict__.setdefault('stack', [])
+        for held in stack:
+            edge = (held.name, self.name)
+            if held is not self and edge not in _order_edges:
+                with _registry_lock:  # only new edges take the lock
+                    _order_edges.setdefault(edge, site)
+        stack.append(self)
+
+        self.acquisitions += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self.call_sites[site] += 1
+        self._acquired_at = time.perf_counter()
+        return True
+
+    def release(self):
+        if self._reentrant:
+            self._depth -= 1
+            if self._depth > 0:
+                self._lock.release()
+                return
+        hold = time.perf_counter() - self._acquired_at
+        self.total_hold += hold
+        self.max_hold = max(self.max_hold, hold)
+        stack = _held.__dict__.get('stack', [])
+        if self in stack:
+            stack.remove(self)
+        self._lock.release()
+
+    def locked(self):
+        if self._reentrant:
+            return self._depth > 0
+        return self._lock.locked()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+_INTERNAL_CODE = {make_lock.__code__, make_rlock.__code__, InstrumentedLock.__init__.__code__,
+                  InstrumentedLock.acquire.__code__, InstrumentedLock.__enter__.__code__}
+
+
+# ==============================================================================
+# Reports
+# ==============================================================================
+
+def hottest_locks(top=5):
+    """Locks sorted by total time threads spent waiting for them."""
+    with _registry_lock:
+        locks = list(_registry)
+    return sorted(locks, key=lambda lock: lock.total_wait, reverse=True)[:top]
+
+
+def lock_order_cycles():
+    """
+    Find cycles in the lock-order graph. Each cycle is a list of
+    (held, acquired, call site) edges that could deadlock together.
+    """
+    with _registry_lock:  # instrumented threads may be adding edges
+        edges = dict(_order_edges)
+    graph = {}
+    for (a, b) in edges:
+        graph.setdefault(a, []).append(b)
+
+    cycles, seen = [], set()
+
+    def visit(node, path):
+        for nxt in graph.get(node, []):
+            if nxt in path:
+                cycle = path[path.index(nxt):] + [nxt]
+                key = frozenset(cycle)
+                if key not in seen:
+                    seen.add(key)
+                    cycles.append([(x, y, edges[(x, y)]) for x, y in zip(cycle, cycle[1:])])
+            elif len(path) < 16:
+                visit(nxt, path + [nxt])
+
+    for start in list(graph):
+        visit(start, [start])
+    return cycles
+
+
+def report(top=5):
+    print(f"{'lock':<32} {'acq':>7} {'contended':>9} {'wait ms':>9} {'max wait':>9} {'hold ms':>9}")
+    for lock in hottest_locks(top):
+        print(f"{lock.name:<32} {lock.acquisitions:>7} {lock.contended:>9} "
+              f"{lock.total_wait * 1000:>9.2f} {lock.max_wait * 1000:>9.2f} {lock.total_hold * 1000:>9.2f}")
+        for site, count in lock.call_sites.most_common(2):
+            print(f"    {count:>7}x {site}")
+    cycles = lock_order_cycles()
+    if cycles:
+        print("\nPotential deadlocks (lock-order cycles):")
+        for cycle in cycles:
+            for held, acquired, site in cycle:
+                print(f"    holding {held!r}, acquired {acquired!r} at {site}")
+            print()
+    else:
+        print("\nNo lock-order cycles found.")
+
+
+def reset():
+    with _registry_lock:
+        _registry.clear()
+        _order_edges.clear()
+
+
+if __name__ == "__main__":
+    enable()
+    lock1 = make_lock("lock1")
+    lock2 = make_lock("lock2")
+    counter_lock = make_lock("counter_lock")
+
+    # The two halves of deadlock_example.py, run one after the other so they
+    # cannot actually deadlock - the profiler still spots the inversion.
+    def thread1_action():
+        with lock1:
+            with lock2:
+                pass
+
+    def thread2_action():
+        with lock2:
+            with lock1:
+                pass
+
+    for action in (thread1_action, thread2_action):
+        t = threading.Thread(target=action)
+        t.start()
+        t.join()
+
+    # A contended lock: four threads fight over one counter.
+    counter = [0]
+
+    def work():
+        for _ in range(20000):
+            with counter_lock:
+                counter[0] += 1
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    report()
+
+    # Disabled: make_lock() hands out the plain lock type, so there is no overhead.
+    disable()
+    print(f"\nDisabled profiling returns: {type(make_lock('x'))}")
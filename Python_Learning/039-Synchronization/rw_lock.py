@@ -0,0 +1,217 @@
+import random
+import threading
+import time
+from types import MappingProxyType
+
+# synchronization_example.py protects shared state with one threading.Lock,
+# so two threads that only *read* the state still take turns. For state that
+# is read constantly and changed rarely (configuration, routing tables,
+# feature flags) there are two better options:
+#
+# RWLock - any number of readers at once, writers alone. It is writer-
+#   preferring: once a writer is waiting, new readers queue behind it, so a
+#   steady stream of readers cannot starve the writers.
+#
+# Snapshot - copy-on-write, in the spirit of RCU (read-copy-update). Readers
+#   take the current snapshot with a single attribute read and no lock at all.
+#   A writer copies the data, changes the copy and publishes it by replacing
+#   the reference; readers holding the old snapshot keep a consistent view.
+#   Writes cost a full copy, so this suits small, rarely changed state.
+
+
+class RWLock:
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+        self._read_guard = _Guard(self.acquire_read, self.release_read)
+        self._write_guard = _Guard(self.acquire_write, self.release_write)
+
+    def acquire_read(self):
+        with self._cond:
+            while self._writer or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._cond:
+            self._readers -= 1
+            if not self._readers:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        with self._cond:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+
+    def release_write(self):
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
+
+    def read_lock(self):
+        """with lock.read_lock(): ..."""
+        return self._read_guard
+
+    def write_lock(self):
+        """with lock.write_lock(): ..."""
+        return self._write_guard
+
+
+class _Guard:
+    """A reusable context manager; cheaper than a @contextmanager generator per use."""
+
+    def __init__(self, acquire, release):
+        self._acquire = acquire
+        self._release = release
+
+    def __enter__(self):
+        self._acquire()
+
+    def __exit__(self, *exc):
+        self._release()
+
+
+class Snapshot:
+    """A dict-like snapshot that readers get without locking."""
+
+    def __init__(self, initial=None):
+        self._current = MappingProxyType(dict(initial or {}))
+        self._write_lock = threading.Lock()  # writers still take turns
+        self.version = 0
+
+    def get(self):
+        """The current read-only snapshot; it never changes after it is returned."""
+        return self._current
+
+    def update(self, changes=None, **kwargs):
+        with self._write_lock:
+            data = dict(self._current)
+            data.update(changes or {}, **kwargs)
+            self._current = MappingProxyType(data)  # publishing is one reference swap
+            self.version += 1
+
+    def modify(self, fn):
+        """Publish fn(copy) for changes beyond update(), e.g. deleting keys."""
+        with self._write_lock:
+            data = dict(self._current)
+            fn(data)
+            self._current = MappingProxyType(data)
+            self.version += 1
+
+
+# ==============================================================================
+# Benchmark: read-heavy mixes against a plain Lock
+# ==============================================================================
+
+def benchmark(threads=8, ops_per_thread=50_000, io_ops_per_thread=2_000, keys=100):
+    """
+    Two kinds of read: a bare dict lookup, and a lookup followed by 50 us of
+    blocking I/O (time.sleep) while the lock is still held.
+    """
+    initial = {f"key{i}": i for i in range(keys)}
+    read_io = 0.0  # set per run by the loop at the bottom
+
+    def with_lock():
+        lock, data = threading.Lock(), dict(initial)
+
+        def read(k):
+            with lock:
+                if read_io:
+                    time.sleep(read_io)
+                return data[k]
+
+        def write(k, v):
+            with lock:
+                data[k] = v
+        return read, write
+
+    def with_rwlock():
+        lock, data = RWLock(), dict(initial)
+
+        def read(k):
+            with lock.read_lock():
+                if read_io:
+                    time.sleep(read_io)
+                return data[k]
+
+        def write(k, v):
+            with lock.write_lock():
+                data[k] = v
+        return read, write
+
+    def with_snapshot():
+        snap = Snapshot(initial)
+
+        def read(k):
+            value = snap.get()[k]
+            if read_io:
+                time.sleep(read_io)
+            return value
+
+        def write(k, v):
+            snap.update({k: v})
+        return read, write
+
+    def run(make, write_ratio, ops):
+        read, write = make()
+        names = list(initial)
+
+        def worker(seed):
+            rnd = random.Random(seed)
+            for _ in range(ops):
+                key = rnd.choice(names)
+                if rnd.random() < write_ratio:
+                    write(key, 0)
+                else:
+                    read(key)
+
+        workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+        start = time.perf_counter()
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        return threads * ops / (time.perf_counter() - start) / 1000
+
+    print(f"{threads} threads, throughput in thousands of ops/s")
+    print(f"{'read':<20} {'read/write':>10} {'Lock':>9} {'RWLock':>9} {'Snapshot':>9}")
+    for label, read_io, ops in (("dict lookup", 0.0, ops_per_thread),
+                                ("lookup + 50 us I/O", 0.00005, io_ops_per_thread)):
+        for reads, write_ratio in (("95/5", 0.05), ("99/1", 0.01)):
+            results = [run(make, write_ratio, ops) for make in (with_lock, with_rwlock, with_snapshot)]
+            print(f"{label:<20} {reads:>10} {results[0]:9.1f} {results[1]:9.1f} {results[2]:9.1f}")
+
+
+if __name__ == "__main__":
+    # Readers keep a consistent view while a writer updates the config
+    config = Snapshot({"timeout": 1.0, "retries": 3})
+    seen = config.get()
+    config.update(timeout=2.0, retries=5)
+    print(f"old snapshot: {dict(seen)}, new snapshot: {dict(config.get())} (version {config.version})")
+
+    lock = RWLock()
+    shared = {"value": 0}
+
+    def reader(name):
+        with lock.read_lock():
+            print(f"{name} reads {shared['value']}")
+            time.sleep(0.1)  # the other readers are inside at the same time
+
+    def writer():
+        with lock.write_lock():
+            shared["value"] += 1
+            print(f"writer sets {shared['value']}")
+
+    threads = [threading.Thread(target=reader, args=(f"reader-{i}",)) for i in range(3)]
+    threads.append(threading.Thread(target=writer))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    print()
+    benchmark()
@@ -0,0 +1,135 @@
+import threading
+import time
+
+# In synchronization_example.py every single increment acquires and releases
+# one global lock, so the threads spend their time waiting for each other.
+# A striped (sharded) counter gives every thread its own cell instead:
+# - add() only touches the calling thread's cell, so it needs no lock.
+# - value adds up all cells; this is the only place that takes a lock.
+# Reads are slower than writes, which is the right trade for a counter that
+# is incremented constantly and read occasionally (metrics, statistics).
+
+
+class StripedCounter:
+    def __init__(self):
+        self._cells = []  # one [value] list per thread that has ever added
+        self._cells_lock = threading.Lock()
+        self._local = threading.local()
+
+    def _cell(self):
+        try:
+            return self._local.cell
+        except AttributeError:
+            cell = self._local.cell = [0]
+            with self._cells_lock:
+                self._cells.append(cell)
+            return cell
+
+    def add(self, amount=1):
+        """Add `amount` (may be negative). Use one add(n) for a batch of n events."""
+        self._cell()[0] += amount
+
+    def increment(self):
+        self.add(1)
+
+    def decrement(self):
+        self.add(-1)
+
+    def batched(self, size=1000):
+        """
+        Accumulate locally and publish once per `size` events:
+            with counter.batched() as batch:
+                for item in items:
+                    batch.add()
+        """
+        return CounterBatch(self, size)
+
+    @property
+    def value(self):
+        """Combine all cells. Exact once the writers have finished."""
+        with self._cells_lock:
+            return sum(cell[0] for cell in self._cells)
+
+
+class CounterBatch:
+    def __init__(self, counter, size):
+        self._counter = counter
+        self._size = size
+        self._pending = 0
+
+    def add(self, amount=1):
+        self._pending += amount
+        if self._pending >= self._size:
+            self.flush()
+
+    def flush(self):
+        if self._pending:
+            self._counter.add(self._pending)
+            self._pending = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+
+class LockedCounter:
+    """The single-lock version from synchronization_example.py, for comparison."""
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def add(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+
+def benchmark(thread_counts=(1, 2, 4, 8, 16, 32), total_ops=1_000_000, batch=1000):
+    """Print million ops/sec for each counter as the thread count grows."""
+    print(f"{'threads':>7} {'single lock':>12} {'striped':>10} {'striped+batch':>14}  (M ops/s)")
+    for n in thread_counts:
+        per_thread = total_ops // n
+        results = []
+
+        def one_by_one(c):
+            for _ in range(per_thread):
+                c.add(1)
+
+        def batched(c):
+            with c.batched(batch) as local:
+                for _ in range(per_thread):
+                    local.add(1)
+
+        for counter, work in ((LockedCounter(), one_by_one),
+                              (StripedCounter(), one_by_one),
+                              (StripedCounter(), batched)):
+            threads = [threading.Thread(target=work, args=(counter,)) for _ in range(n)]
+            start = time.perf_counter()
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            elapsed = time.perf_counter() - start
+            assert counter.value == per_thread * n, counter.value
+            results.append(per_thread * n / elapsed / 1e6)
+
+        print(f"{n:>7} {results[0]:>12.2f} {results[1]:>10.2f} {results[2]:>14.2f}")
+
+
+if __name__ == "__main__":
+    # The same workload as synchronization_example.py, without a global lock
+    counter = StripedCounter()
+    thread1 = threading.Thread(target=lambda: [counter.increment() for _ in range(1000000)])
+    thread2 = threading.Thread(target=lambda: [counter.decrement() for _ in range(1000000)])
+
+    thread1.start()
+    thread2.start()
+
+    thread1.join()
+    thread2.join()
+
+    print(f"Final value of striped counter: {counter.value}")
+    print()
+    benchmark()
@@ -3,56 +3,152 @@
 # 1. Socket Programming: A simple TCP Server and Client
 
 # TCP Server
+import os
 import socket
+import time
 
-def run_server():
+from framing import FrameReader, send_frame
+from resolver import resolve
+
+PORT = 12345
+GREETING = 'Thank you for connecting'
+BUSY = 'Server busy, try again later'
+
+def create_server_socket(host, port, unix_path=None, backlog=5):
+    """
+    Create a listening socket: TCP on (host, port), or a Unix domain socket
+    at `unix_path`. Unix domain sockets skip the TCP/IP stack entirely,
+    which makes them the cheapest transport between processes on one host.
+    """
+    if unix_path:
+        # AF_UNIX: Address Family -> a path in the local filesystem
+        server_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # A socket file left behind by a previous run would make bind() fail
+        if os.path.exists(unix_path):
+            os.unlink(unix_path)
+        server_socket.bind(unix_path)
+    else:
+        # Resolve the host name once through the shared cache (see resolver.py)
+        # family: AF_INET (IPv4) or AF_INET6; SOCK_STREAM: Socket Type -> TCP
+        if host:
+            family, _, _, _, address = resolve(host, port)[0]
+        else:
+            family, address = socket.AF_INET, ('', port)  # all interfaces
+        server_socket = socket.socket(family, socket.SOCK_STREAM)
+        server_socket.bind(address)
+    server_socket.listen(backlog)
+    return server_socket
+
+def create_client_socket(host, port, unix_path=None):
+    """Connect to a server over TCP, or over a Unix domain socket if `unix_path` is given."""
+    if unix_path:
+        client_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        client_socket.connect(unix_path)
+    else:
+        # Cached lookup: repeated connections do not resolve the name again
+        family, _, _, _, address = resolve(host, port)[0]
+        client_socket = socket.socket(family, socket.SOCK_STREAM)
+        client_socket.connect(address)
+    return client_socket
+
+def run_server(host=None, port=PORT, mode='blocking', framed=False, root='.', unix_path=None,
+               backlog=None, admission=None):
     """
     This function runs a simple TCP server.
+    With framed=True the greeting is sent as a length-prefixed frame
+    (see framing.py). With unix_path set, the server listens on that
+    Unix domain socket instead of host:port. `admission` takes an
+    AdmissionController (see admission_control.py) to rate limit clients
+    and, in asyncio mode, cap the connections in flight. `backlog` is the
+    listen queue length; by default 5 in blocking mode and
+    async_server.BACKLOG in the other modes.
+
+    mode='blocking' serves one client at a time with accept()/send()/close().
+    mode='asyncio' serves many clients concurrently on one thread
+    (see async_server.py).
+    mode='prefork' runs one asyncio worker process per core, all sharing
+    the port through SO_REUSEPORT (see prefork_server.py).
+    mode='files' serves files under `root` with zero-copy sendfile()
+    instead of the greeting (see file_server.py).
     """
-    # Create a socket object
-    # AF_INET: Address Family -> IPv4
-    # SOCK_STREAM: Socket Type -> TCP
-    server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-
     # Get local machine name
-    host = socket.gethostname()
-    port = 12345
-
-    # Bind to the port
-    server_socket.bind((host, port))
-
-    # Queue up to 5 requests
-    server_socket.listen(5)
-
-    print(f"Server listening on {host}:{port}")
-
+    host = host or socket.gethostname()
+
+    if mode == 'asyncio':
+        from async_server import run_async_server
+        run_async_server(host, port, framed=framed, unix_path=unix_path, admission=admission,
+                         backlog=backlog)
+        return
+    if mode == 'files':
+        from file_server import run_file_server
+        run_file_server(host, port, root, unix_path=unix_path, backlog=backlog)
+        return
+    if mode == 'prefork':
+        if unix_path:
+            raise ValueError("SO_REUSEPORT pre-forking needs a TCP port, not a Unix socket")
+        from prefork_server import run_prefork_server
+        run_prefork_server(host, port, framed=framed, backlog=backlog)
+        return
+    if mode != 'blocking':
+        raise ValueError(f"Unknown server mode: {mode!r}")
+
+    # Create a socket object, bind it and queue up to `backlog` requests
+    server_socket = create_server_socket(host, port, unix_path, 5 if backlog is None else backlog)
+
+    print(f"Server listening on {unix_path or f'{host}:{port}'}")
+    serve_blocking(server_socket, framed=framed, admission=admission)
+
+def serve_blocking(server_socket, verbose=True, delay=0.0, framed=False, admission=None):
+    """
+    The original accept loop: one client at a time, so a slow client
+    stalls every other connection waiting in the listen backlog.
+    `delay` simulates per-connection I/O wait (e.g. a backend call).
+    """
     while True:
         # Establish a connection
         client_socket, addr = server_socket.accept()
-        print(f"Got a connection from {addr}")
+        if verbose:
+            print(f"Got a connection from {addr}")
+
+        # Turn away clients over their rate limit before doing any work
+        if admission is not None and not admission.admit_nowait(addr[0] if addr else 'local'):
+            if framed:
+                send_frame(client_socket, BUSY.encode('ascii'))
+            else:
+                client_socket.send(BUSY.encode('ascii'))
+            client_socket.close()
+            continue
+
+        if delay:
+            time.sleep(delay)
 
         # Send a thank you message to the client.
-        message = 'Thank you for connecting'
-        client_socket.send(message.encode('ascii'))
+        if framed:
+            send_frame(client_socket, GREETING.encode('ascii'))
+        else:
+            client_socket.send(GREETING.encode('ascii'))
         client_socket.close()
 
 # TCP Client
-def run_client():
+def run_client(host=None, port=PORT, framed=False, unix_path=None):
     """
     This function runs a simple TCP client.
+    With framed=True it reads one length-prefixed frame, however many
+    recv() calls that takes. With unix_path set, it connects to that
+    Unix domain socket instead of host:port.
     """
-    # Create a socket object
-    client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-
     # Get local machine name
-    host = socket.gethostname()
-    port = 12345
+    host = host or socket.gethostname()
 
-    # Connection to hostname on the port.
-    client_socket.connect((host, port))
+    # Create a socket object and connect to hostname on the port.
+    client_socket = create_client_socket(host, port, unix_path)
 
-    # Receive no more than 1024 bytes
-    message = client_socket.recv(1024)
+    if framed:
+        # Read exactly one frame into a reusable buffer
+        message = bytes(FrameReader(client_socket).read_frame() or b'')
+    else:
+        # Receive no more than 1024 bytes
+        message = client_socket.recv(1024)
     client_socket.close()
 
     print(f"Received from server: {message.decode('ascii')}")
@@ -124,6 +220,8 @@ if __name__ == '__main__':
     # import sys
     # if len(sys.argv) > 1 and sys.argv[1] == 'server':
     #     run_server()
+    # elif len(sys.argv) > 1 and sys.argv[1] == 'async-server':
+    #     run_server(mode='asyncio')
     # elif len(sys.argv) > 1 and sys.argv[1] == 'client':
     #     run_client()
 
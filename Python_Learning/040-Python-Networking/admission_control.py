@@ -0,0 +1,215 @@
+"""
+Backpressure, Admission Control and Rate Limiting
+
+Without limits, a burst of clients overflows the listen backlog (connection
+resets) and every accepted client competes for the same resources (latency
+spikes for everyone). Admission control decides up front who gets served:
+
+- Token bucket per client IP: each client may make `rate` requests per second
+  on average, with bursts of up to `burst`. Excess requests are rejected at
+  once, which is cheap.
+- Max in-flight: at most `max_in_flight` connections are handled at the same
+  time. Further clients wait in a queue...
+- ...but only for `queue_timeout` seconds. Failing fast is better than
+  making a client wait for an answer it has already given up on.
+
+Rejected clients get BUSY instead of the greeting. Counters in
+`controller.stats` show how many requests were admitted, queued and
+rejected, so capacity can be tuned under load.
+"""
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+
+from Networking import BUSY
+from framing import HEADER
+
+
+# ==============================================================================
+# 1. Token bucket
+# ==============================================================================
+
+class TokenBucket:
+    """Refills `rate` tokens per second up to `burst`; each request takes one."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+
+    def try_acquire(self, tokens=1):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens >= tokens:
+            self._tokens -= tokens
+            return True
+        return False
+
+
+# ==============================================================================
+# 2. The admission controller
+# ==============================================================================
+
+class AdmissionController:
+    """
+    Combines per-client rate limits with a cap on in-flight connections.
+
+    rate/burst of None disables rate limiting; max_in_flight of None
+    disables the concurrency cap.
+    """
+
+    def __init__(self, max_in_flight=100, queue_timeout=1.0, rate=None, burst=None,
+                 max_tracked_clients=10000):
+        self.max_in_flight = max_in_flight
+        self.queue_timeout = queue_timeout
+        self.rate = rate
+        self.burst = burst if burst is not None else rate
+        self.max_tracked_clients = max_tracked_clients
+        self._buckets = OrderedDict()  # client ip -> TokenBucket, least recently seen first
+        self._lock = threading.Lock()
+        self._slots = None  # created lazily inside the running event loop
+        self.stats = {'admitted': 0, 'queued': 0, 'rejected_rate_limited': 0,
+                      'rejected_queue_timeout': 0, 'in_flight': 0, 'waiting': 0,
+                      'max_queue_wait_ms': 0.0}
+
+    def allow_client(self, client_ip):
+        """Apply the client's token bucket. Safe to call from any thread."""
+        if not self.rate:
+            return True
+        with self._lock:
+            bucket = self._buckets.pop(client_ip, None) or TokenBucket(self.rate, self.burst)
+            self._buckets[client_ip] = bucket
+            if len(self._buckets) > self.max_tracked_clients:
+                self._buckets.popitem(last=False)  # forget the longest-idle client
+            allowed = bucket.try_acquire()
+            if not allowed:
+                self.stats['rejected_rate_limited'] += 1
+            return allowed
+
+    def admit_nowait(self, client_ip):
+        """
+        Rate-limit check for servers without an in-flight cap, such as the
+        blocking loop in Networking.py (it only ever serves one client).
+        """
+        if not self.allow_client(client_ip):
+            return False
+        self.stats['admitted'] += 1
+        return True
+
+    async def admit(self, client_ip):
+        """
+        Return True once the client may be served (call release() afterwards),
+        or False if it was rate limited or waited longer than queue_timeout.
+        """
+        if not self.allow_client(client_ip):
+            return False
+        if self.max_in_flight is None:
+            self.stats['admitted'] += 1
+            self.stats['in_flight'] += 1
+            return True
+
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+        if self._slots.locked():
+            self.stats['queued'] += 1
+            self.stats['waiting'] += 1
+            start = time.perf_counter()
+            try:
+                if not await self._acquire_within(self.queue_timeout):
+                    self.stats['rejected_queue_timeout'] += 1
+                    return False
+            finally:
+                self.stats['waiting'] -= 1
+                waited = (time.perf_counter() - start) * 1000
+                self.stats['max_queue_wait_ms'] = max(self.stats['max_queue_wait_ms'], waited)
+        else:
+            await self._slots.acquire()
+        self.stats['admitted'] += 1
+        self.stats['in_flight'] += 1
+        return True
+
+    async def _acquire_within(self, timeout):
+        """
+        Take a slot within `timeout` seconds; False if none came free.
+        asyncio.wait_for(sem.acquire(), timeout) can, on Python 3.11 and
+        earlier, take the permit and still raise TimeoutError, leaking it.
+        Here the acquire runs as its own task: if it is still pending at the
+        timeout it is cancelled, and Semaphore.acquire() hands on a permit
+        granted at that last moment.
+        """
+        acquire = asyncio.ensure_future(self._slots.acquire())
+        try:
+            await asyncio.wait({acquire}, timeout=timeout)
+        except BaseException:  # our caller was cancelled
+            if acquire.done() and not acquire.cancelled():
+                self._slots.release()
+            acquire.cancel()
+            raise
+        if acquire.done():
+            return True
+        acquire.cancel()
+        return False
+
+    def release(self):
+        self.stats['in_flight'] -= 1
+        if self._slots is not None:
+            self._slots.release()
+
+    def rejected(self):
+        return self.stats['rejected_rate_limited'] + self.stats['rejected_queue_timeout']
+
+
+def with_admission(handler, controller, framed=False):
+    """
+    Wrap an asyncio connection handler so it only runs for admitted clients.
+    With framed=True, BUSY is sent as a length-prefixed frame, like the
+    greeting it replaces.
+    """
+    busy = BUSY.encode('ascii')
+    if framed:
+        busy = HEADER.pack(len(busy)) + busy
+
+    async def admitted_handler(reader, writer):
+        peer = writer.get_extra_info('peername')
+        client_ip = peer[0] if isinstance(peer, tuple) else 'local'
+        if not await controller.admit(client_ip):
+            writer.write(busy)
+            try:
+                await writer.drain()
+            except ConnectionError:
+                pass
+            writer.close()
+            return
+        try:
+            await handler(reader, writer)
+        finally:
+            controller.release()
+
+    return admitted_handler
+
+
+# ==============================================================================
+# 3. Demo: a burst against a server with slow handlers
+# ==============================================================================
+
+def demo():
+    from async_server import make_greeting_handler, start_async_server_in_thread
+    from load_generator import format_report, run_load
+
+    controller = AdmissionController(max_in_flight=50, queue_timeout=0.05, rate=500, burst=200)
+    handler = with_admission(make_greeting_handler(0.01), controller)
+    port, stop = start_async_server_in_thread(handler=handler)
+    try:
+        report = run_load('127.0.0.1', port, connections=2000, concurrency=500)
+        print(format_report("admission", report))
+        print(f"stats: {controller.stats}")
+    finally:
+        stop()
+
+
+if __name__ == '__main__':
+    demo()
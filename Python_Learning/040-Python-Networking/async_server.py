@@ -0,0 +1,236 @@
+"""
+Asynchronous TCP Server with asyncio
+
+run_server() in Networking.py handles one client at a time: accept(), send(),
+close(), repeat. While it is busy with one connection every other client waits
+in the listen backlog. asyncio multiplexes all connections on a single thread
+with an event loop (epoll on Linux), so thousands of clients can be served
+concurrently on one core. The greeting protocol is unchanged: the server sends
+GREETING and closes the connection.
+"""
+
+import asyncio
+import os
+import socket
+import threading
+
+from framing import HEADER, REQUEST_ID
+from Networking import GREETING, PORT
+
+# A large backlog lets bursts of clients queue in the kernel instead of
+# being reset while the event loop is busy.
+BACKLOG = 1024
+
+
+# ==============================================================================
+# 1. The connection handler
+# ==============================================================================
+
+async def handle_greeting(reader, writer):
+    """Send the greeting to one client and close the connection."""
+    writer.write(GREETING.encode('ascii'))
+    try:
+        # drain() waits only if the socket's send buffer is full,
+        # yielding to other connections instead of blocking them.
+        await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def handle_framed_greeting(reader, writer):
+    """Send the greeting as one length-prefixed frame (see framing.py)."""
+    payload = GREETING.encode('ascii')
+    # writelines() hands both buffers to the transport without joining them.
+    writer.writelines([HEADER.pack(len(payload)), payload])
+    try:
+        await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def handle_requests(reader, writer):
+    """
+    Keep-alive request/response handler. Each request frame is a request id
+    followed by a body; the reply carries the same id and echoes the body.
+    Requests are answered concurrently, so pipelined replies may come back
+    out of order.
+    """
+    async def reply(request_id, body):
+        writer.writelines([HEADER.pack(REQUEST_ID.size + len(body)),
+                           REQUEST_ID.pack(request_id), body])
+        await writer.drain()
+
+    tasks = set()
+    try:
+        while True:
+            (length,) = HEADER.unpack(await reader.readexactly(HEADER.size))
+            if length < REQUEST_ID.size:
+                break  # no room for a request id: not our protocol, hang up
+            frame = await reader.readexactly(length)
+            (request_id,) = REQUEST_ID.unpack_from(frame)
+            task = asyncio.create_task(reply(request_id, frame[REQUEST_ID.size:]))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass  # client closed the connection
+    finally:
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+        writer.close()
+
+
+def make_greeting_handler(delay):
+    """
+    A greeting handler that first waits `delay` seconds, simulating I/O.
+    Unlike time.sleep() in the blocking loop, asyncio.sleep() lets the
+    event loop serve other clients in the meantime.
+    """
+    async def handler(reader, writer):
+        await asyncio.sleep(delay)
+        await handle_greeting(reader, writer)
+    return handler
+
+
+# ==============================================================================
+# 2. Starting the server
+# ==============================================================================
+
+async def start_async_server(host=None, port=PORT, handler=handle_greeting, unix_path=None, backlog=None):
+    """Create and return a listening asyncio server (TCP, or Unix socket at `unix_path`)."""
+    backlog = BACKLOG if backlog is None else backlog
+    if unix_path:
+        if os.path.exists(unix_path):
+            os.unlink(unix_path)
+        return await asyncio.start_unix_server(handler, unix_path, backlog=backlog)
+    host = host or socket.gethostname()
+    return await asyncio.start_server(handler, host, port, backlog=backlog)
+
+
+def run_async_server(host=None, port=PORT, framed=False, unix_path=None, admission=None, backlog=None):
+    """
+    Run the asyncio greeting server until interrupted.
+    This is what run_server(mode='asyncio') calls.
+    """
+    handler = handle_framed_greeting if framed else handle_greeting
+    if admission is not None:
+        from admission_control import with_admission
+        handler = with_admission(handler, admission, framed=framed)
+
+    async def main():
+        server = await start_async_server(host, port, handler, unix_path, backlog)
+        addrs = ', '.join(str(sock.getsockname()) for sock in server.sockets)
+        print(f"Async server listening on {addrs}")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("Async server stopped.")
+
+
+def start_async_server_in_thread(host='127.0.0.1', port=0, handler=handle_greeting):
+    """
+    Run an asyncio server on a background daemon thread.
+    Returns (port, stop) where stop() shuts the server down; handy for
+    benchmarks that drive the server from the same process.
+    """
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+    state = {}
+
+    async def stoppable(reader, writer):
+        # stop() cancels the handlers still running. The task ends here
+        # instead of re-raising: Python 3.11's StreamReaderProtocol calls
+        # task.exception() on finished handler tasks, which would log every
+        # cancelled one as an error.
+        try:
+            await handler(reader, writer)
+        except asyncio.CancelledError:
+            writer.close()
+
+    async def main():
+        server = await start_async_server(host, port, stoppable)
+        state['server'] = server
+        state['port'] = server.sockets[0].getsockname()[1]
+        started.set()
+        async with server:
+            try:
+                await server.serve_forever()
+            except asyncio.CancelledError:
+                pass
+
+    def runner():
+        asyncio.set_event_loop(loop)
+        task = loop.create_task(main())
+        state['task'] = task
+        loop.run_until_complete(task)
+        # Cancel the client handlers still running, so they finish cleanly
+        # instead of being destroyed with the loop.
+        pending = asyncio.all_tasks(loop)
+        for t in pending:
+            t.cancel()
+        loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
+
+    thread = threading.Thread(target=runner, name="AsyncServer", daemon=True)
+    thread.start()
+    started.wait()
+
+    def stop():
+        loop.call_soon_threadsafe(state['task'].cancel)
+        thread.join(timeout=5)
+
+    return state['port'], stop
+
+
+# ==============================================================================
+# 3. Comparing with the blocking accept loop
+# ==============================================================================
+
+def compare_with_blocking(connections=2000, concurrency=500, delay=0.0):
+    """
+    Drive both servers with the same load and print connections/sec and
+    p50/p99 connect-to-greeting latency for each. With a non-zero `delay`
+    (simulated I/O per connection) the blocking loop serialises the waits
+    while the asyncio server overlaps them.
+    """
+    from Networking import serve_blocking
+    from load_generator import format_report, run_load
+
+    # The blocking server, bound to an ephemeral loopback port.
+    blocking_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    blocking_socket.bind(('127.0.0.1', 0))
+    blocking_socket.listen(BACKLOG)
+    blocking_port = blocking_socket.getsockname()[1]
+
+    def blocking_runner():
+        try:
+            serve_blocking(blocking_socket, verbose=False, delay=delay)
+        except OSError:
+            pass  # the listening socket was closed at the end of the run
+
+    threading.Thread(target=blocking_runner, name="BlockingServer", daemon=True).start()
+
+    handler = make_greeting_handler(delay) if delay else handle_greeting
+    async_port, stop_async = start_async_server_in_thread(handler=handler)
+
+    try:
+        for name, port in (("blocking", blocking_port), ("asyncio", async_port)):
+            report = run_load('127.0.0.1', port, connections, concurrency)
+            print(format_report(name, report))
+    finally:
+        stop_async()
+        blocking_socket.close()
+
+
+if __name__ == '__main__':
+    print("--- Greeting only ---")
+    compare_with_blocking()
+    print("\n--- With 5 ms of simulated I/O per connection ---")
+    compare_with_blocking(connections=500, concurrency=250, delay=0.005)
@@ -0,0 +1,292 @@
+"""
+Client Connection Pool with Keep-Alive and Request Pipelining
+
+run_client() opens a new TCP connection for every call, pays the three-way
+handshake, exchanges one message and closes the socket. A connection pool
+keeps connections open and reuses them:
+
+- Keep-alive: connections stay open between requests (SO_KEEPALIVE lets the
+  OS detect dead peers on long-idle sockets).
+- Pipelining: each request frame carries a request id, so many callers can
+  have requests in flight on the same socket. A reader thread per connection
+  matches replies to callers by id.
+- Limits: at most `max_per_host` connections per (host, port), and at most
+  `max_idle` idle connections kept once the load drops.
+- Health checks: closed or broken connections are dropped before reuse.
+
+The server side of the protocol is handle_requests() in async_server.py.
+"""
+
+import itertools
+import socket
+import threading
+import time
+from concurrent.futures import Future
+
+from framing import FrameReader, REQUEST_ID, send_frame
+from resolver import create_connection
+
+
+_MSG_DONTWAIT = getattr(socket, 'MSG_DONTWAIT', 0)  # not available on Windows
+
+
+class PoolClosedError(Exception):
+    """Raised when a request is made on a closed pool or connection."""
+
+
+# ==============================================================================
+# 1. One multiplexed connection
+# ==============================================================================
+
+class MultiplexedConnection:
+    """A single socket shared by many concurrent requests."""
+
+    def __init__(self, host, port, timeout=5.0):
+        self.address = (host, port)
+        self._sock = create_connection(self.address, timeout=timeout)
+        self._sock.settimeout(None)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._send_lock = threading.Lock()
+        self._pending = {}  # request id -> Future
+        self._pending_lock = threading.Lock()
+        self._reserved = 0  # handed out by the pool but not yet sent
+        self._ids = itertools.count(1)
+        self.closed = False
+        self.last_used = time.monotonic()
+        self._reader = threading.Thread(target=self._read_loop, daemon=True,
+                                        name=f"PoolReader-{host}:{port}")
+        self._reader.start()
+
+    @property
+    def in_flight(self):
+        return len(self._pending) + self._reserved
+
+    def reserve(self):
+        """Count a request the pool is about to send, so it is not pruned meanwhile."""
+        with self._pending_lock:
+            self._reserved += 1
+
+    def request(self, body, reserved=False):
+        """Send `body` and return a Future that resolves to the reply bytes."""
+        future = Future()
+        request_id = next(self._ids)
+        with self._pending_lock:
+            if reserved:
+                self._reserved -= 1
+            if self.closed:
+                raise PoolClosedError("Connection is closed")
+            self._pending[request_id] = future
+        try:
+            with self._send_lock:
+                send_frame(self._sock, REQUEST_ID.pack(request_id) + body)
+        except OSError as e:
+            self._fail_all(e)
+            raise
+        self.last_used = time.monotonic()
+        return future
+
+    def _read_loop(self):
+        reader = FrameReader(self._sock)
+        try:
+            for frame in reader:
+                (request_id,) = REQUEST_ID.unpack_from(frame)
+                with self._pending_lock:
+                    future = self._pending.pop(request_id, None)
+                if future is not None:
+                    future.set_result(bytes(frame[REQUEST_ID.size:]))
+            self._fail_all(ConnectionError("Server closed the connection"))
+        except Exception as e:
+            self._fail_all(e)
+
+    def _fail_all(self, error):
+        with self._pending_lock:
+            self.closed = True
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+    def is_healthy(self):
+        """Cheap liveness probe: a peeked read must not report EOF or an error."""
+        if self.closed:
+            return False
+        if self.in_flight or not _MSG_DONTWAIT:
+            # The reader thread marks the connection closed on EOF or an error.
+            # Windows has no MSG_DONTWAIT, and switching the socket to
+            # non-blocking would break the reader's recv() and senders' sendall().
+            return True
+        try:
+            data = self._sock.recv(1, socket.MSG_PEEK | _MSG_DONTWAIT)
+            return data != b''
+        except BlockingIOError:
+            return True  # nothing to read: the connection is idle but alive
+        except OSError:
+            return False
+
+    def close(self):
+        self.closed = True
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+
+
+# ==============================================================================
+# 2. The pool
+# ==============================================================================
+
+class ConnectionPool:
+    """
+    Shares a few multiplexed connections per host among many callers.
+
+    A request goes to the least busy open connection for its host. A new
+    connection is opened only when every existing one already has
+    `pipeline_depth` requests in flight and the host is below `max_per_host`.
+    """
+
+    def __init__(self, max_per_host=4, max_idle=2, idle_timeout=30.0,
+                 pipeline_depth=32, connect_timeout=5.0):
+        self.max_per_host = max_per_host
+        self.max_idle = max_idle
+        self.idle_timeout = idle_timeout
+        self.pipeline_depth = pipeline_depth
+        self.connect_timeout = connect_timeout
+        self._connections = {}  # (host, port) -> [MultiplexedConnection]
+        self._connecting = {}  # (host, port) -> connects in progress, counted against max_per_host
+        self._lock = threading.Lock()
+        self._connect_done = threading.Condition(self._lock)
+        self._closed = False
+        self.stats = {'opened': 0, 'reused': 0, 'discarded': 0}
+
+    def _acquire(self, host, port):
+        key = (host, port)
+        with self._lock:
+            while True:
+                if self._closed:
+                    raise PoolClosedError("Pool is closed")
+                connections = self._connections.setdefault(key, [])
+                self._prune(connections)
+                slots = len(connections) + self._connecting.get(key, 0)
+                best = min(connections, key=lambda c: c.in_flight, default=None)
+                if best is not None and (best.in_flight < self.pipeline_depth
+                                         or slots >= self.max_per_host):
+                    self.stats['reused'] += 1
+                    best.reserve()
+                    return best
+                if slots < self.max_per_host:
+                    self._connecting[key] = self._connecting.get(key, 0) + 1
+                    break
+                # Every slot is taken by a connect still in progress
+                self._connect_done.wait()
+
+        # Connect without holding the lock: a slow or unreachable host must
+        # not stall the callers of every other host.
+        try:
+            conn = MultiplexedConnection(host, port, self.connect_timeout)
+        except BaseException:
+            with self._lock:
+                self._connecting[key] -= 1
+                self._connect_done.notify_all()
+            raise
+        with self._lock:
+            self._connecting[key] -= 1
+            self._connect_done.notify_all()
+            if self._closed:
+                conn.close()
+                raise PoolClosedError("Pool is closed")
+            self._connections.setdefault(key, []).append(conn)
+            self.stats['opened'] += 1
+            conn.reserve()
+            return conn
+
+    def _prune(self, connections):
+        """Drop broken connections and trim idle ones beyond the limits."""
+        now = time.monotonic()
+        idle = 0
+        for conn in list(connections):
+            is_idle = conn.in_flight == 0
+            expired = is_idle and now - conn.last_used > self.idle_timeout
+            if is_idle and not expired:
+                idle += 1
+            if not conn.is_healthy() or expired or (is_idle and idle > self.max_idle):
+                connections.remove(conn)
+                conn.close()
+                self.stats['discarded'] += 1
+
+    def submit(self, host, port, body):
+        """Pipeline a request and return a Future for the reply."""
+        return self._acquire(host, port).request(body, reserved=True)
+
+    def request(self, host, port, body, timeout=None):
+        """Send a request and wait for its reply."""
+        return self.submit(host, port, body).result(timeout)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            self._connect_done.notify_all()
+            for connections in self._connections.values():
+                for conn in connections:
+                    conn.close()
+            self._connections.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ==============================================================================
+# 3. Benchmark: pooled vs. one connection per call
+# ==============================================================================
+
+def request_once(host, port, body):
+    """The run_client() pattern: connect, one request, close."""
+    with socket.create_connection((host, port)) as sock:
+        send_frame(sock, REQUEST_ID.pack(1) + body)
+        frame = FrameReader(sock).read_frame()
+        return bytes(frame[REQUEST_ID.size:])
+
+
+def benchmark(callers=16, requests_per_caller=200, body=b'ping'):
+    """Print requests/sec for connect-per-call and for the pool."""
+    from concurrent.futures import ThreadPoolExecutor
+    from async_server import handle_requests, start_async_server_in_thread
+
+    port, stop = start_async_server_in_thread(handler=handle_requests)
+    host = '127.0.0.1'
+    total = callers * requests_per_caller
+
+    def timed(call):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=callers) as executor:
+            for _ in executor.map(lambda _: [call() for _ in range(requests_per_caller)],
+                                  range(callers)):
+                pass
+        return total / (time.perf_counter() - start)
+
+    try:
+        per_call = timed(lambda: request_once(host, port, body))
+        with ConnectionPool(max_per_host=2) as pool:
+            pooled = timed(lambda: pool.request(host, port, body, timeout=10))
+            stats = pool.stats
+        print(f"connect-per-call: {per_call:8.0f} req/s")
+        print(f"pooled          : {pooled:8.0f} req/s  (connections opened: {stats['opened']})")
+
+        # Pipelining from a single caller: many requests in flight on one socket.
+        with ConnectionPool(max_per_host=1) as pool:
+            start = time.perf_counter()
+            futures = [pool.submit(host, port, body) for _ in range(total)]
+            for future in futures:
+                future.result(timeout=10)
+            pipelined = total / (time.perf_counter() - start)
+        print(f"pipelined (1 socket, 1 caller): {pipelined:8.0f} req/s")
+    finally:
+        stop()
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,256 @@
+"""
+Zero-Copy File Serving with sendfile()
+
+Sending a file with read() + send() copies every byte twice through user
+space: kernel page cache -> Python bytes object -> kernel socket buffer.
+os.sendfile() (socket.sendfile() / loop.sendfile() in Python) asks the kernel
+to move the bytes from the page cache straight to the socket.
+
+Protocol (one request per line, many requests per connection):
+
+    client: GET <path> [<start>-<end>]\\n      (byte range is inclusive, optional)
+    server: one length-prefixed frame: b"OK <length>" or b"ERR <reason>"
+            followed, for OK, by exactly <length> raw file bytes
+
+Paths are resolved relative to the server's root directory and may not
+escape it.
+"""
+
+import asyncio
+import os
+import socket
+
+from framing import HEADER, FrameReader
+from Networking import PORT, create_client_socket
+
+
+class FileRequestError(Exception):
+    """Raised on the client when the server answers with ERR."""
+
+
+class BadRequest(ValueError):
+    """A refused request. The message is a fixed reason code, safe to send to the client."""
+
+
+# ==============================================================================
+# 1. Parsing and validating a request
+# ==============================================================================
+
+def parse_request(line, root):
+    """Return (path, offset, count) for a request line or raise BadRequest."""
+    try:
+        parts = line.decode('utf-8').split()
+    except UnicodeDecodeError:
+        raise BadRequest("bad request") from None
+    if len(parts) not in (2, 3) or parts[0] != 'GET':
+        raise BadRequest("bad request")
+    root = os.path.realpath(root)
+    path = os.path.realpath(os.path.join(root, parts[1].lstrip('/')))
+    if os.path.commonpath([root, path]) != root or not os.path.isfile(path):
+        raise BadRequest("not found")
+
+    size = os.path.getsize(path)
+    offset, count = 0, size
+    if len(parts) == 3:
+        start, _, end = parts[2].partition('-')
+        try:
+            start = int(start) if start else 0
+            end = min(int(end), size - 1) if end else size - 1
+        except ValueError:
+            raise BadRequest("invalid range") from None
+        if start < 0 or start > end:
+            raise BadRequest("invalid range")
+        offset, count = start, end - start + 1
+    return path, offset, count
+
+
+# ==============================================================================
+# 2. The asyncio file server
+# ==============================================================================
+
+def make_file_handler(root):
+    """Return an asyncio connection handler that serves files under `root`."""
+
+    async def handle_files(reader, writer):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:  # longer than the reader's limit; the rest is unparseable
+                    writer.write(_frame(b"ERR request too long"))
+                    await writer.drain()
+                    break
+                if not line:
+                    break
+                try:
+                    path, offset, count = parse_request(line, root)
+                    f = open(path, 'rb')
+                except BadRequest as e:
+                    writer.write(_frame(f"ERR {e}".encode()))
+                    await writer.drain()
+                    continue
+                except (OSError, ValueError) as e:
+                    # The details (paths, errno) stay in the server's output
+                    print(f"File request {line[:200]!r} failed: {e!r}")
+                    writer.write(_frame(b"ERR unavailable"))
+                    await writer.drain()
+                    continue
+                with f:
+                    writer.write(_frame(f"OK {count}".encode()))
+                    if count:
+                        # loop.sendfile() uses os.sendfile() on TCP transports and
+                        # falls back to read()+write() where it is unavailable.
+                        await loop.sendfile(writer.transport, f, offset, count)
+                    else:
+                        await writer.drain()  # sendfile() rejects count=0
+        except (OSError, asyncio.IncompleteReadError):
+            # Includes errors in the middle of a file: after "OK <length>" the
+            # client expects raw bytes, so the connection cannot be saved.
+            pass
+        finally:
+            writer.close()
+
+    return handle_files
+
+
+def _frame(payload):
+    return HEADER.pack(len(payload)) + payload
+
+
+def run_file_server(host=None, port=PORT, root='.', unix_path=None, backlog=None):
+    """Serve files from `root`. This is what run_server(mode='files') calls."""
+    from async_server import start_async_server
+
+    async def main():
+        server = await start_async_server(host, port, make_file_handler(root), unix_path, backlog)
+        print(f"File server for {os.path.abspath(root)} on {server.sockets[0].getsockname()}")
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        print("File server stopped.")
+
+
+# ==============================================================================
+# 3. The client
+# ==============================================================================
+
+class FileClient:
+    """Requests files over one kept-alive connection."""
+
+    def __init__(self, host, port, buffer_size=1024 * 1024, unix_path=None):
+        self._sock = create_client_socket(host, port, unix_path)
+        self._frames = FrameReader(self._sock)
+        self._buffer = bytearray(buffer_size)
+
+    def _status(self, path, byte_range):
+        request = f"GET {path}" + (f" {byte_range[0]}-{byte_range[1]}" if byte_range else "")
+        self._sock.sendall(request.encode('utf-8') + b'\n')
+        status = bytes(self._frames.read_frame() or b'ERR connection closed').decode()
+        if not status.startswith('OK '):
+            raise FileRequestError(status[4:])
+        return int(status[3:])
+
+    def _receive(self, remaining, sink):
+        view = memoryview(self._buffer)
+        while remaining:
+            n = self._sock.recv_into(view, min(remaining, len(view)))
+            if n == 0:
+                raise ConnectionError("Server closed the connection mid-file")
+            if sink is not None:
+                sink(view[:n])
+            remaining -= n
+
+    def get(self, path, byte_range=None, out=None):
+        """
+        Fetch `path` (optionally only byte_range=(start, end), inclusive).
+        Writes to the file object `out` if given, otherwise returns bytes.
+        """
+        length = self._status(path, byte_range)
+        if out is not None:
+            self._receive(length, out.write)
+            return None
+        data = bytearray()
+        self._receive(length, data.extend)
+        return bytes(data)
+
+    def drain(self, path, byte_range=None):
+        """Fetch and discard `path`; returns the number of bytes received."""
+        length = self._status(path, byte_range)
+        self._receive(length, None)
+        return length
+
+    def close(self):
+        self._sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ==============================================================================
+# 4. Benchmark: sendfile() vs. read-then-send
+# ==============================================================================
+
+def _serve_read_send(conn, path, chunk_size=256 * 1024):
+    with open(path, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            conn.sendall(chunk)
+
+
+def _serve_sendfile(conn, path):
+    with open(path, 'rb') as f:
+        conn.sendfile(f)
+
+
+def benchmark(file_size=256 * 1024 * 1024, repeats=3):
+    """
+    Send one large file over loopback both ways and print MB/s together with
+    the CPU time the sending thread spent, which is where sendfile() saves.
+    """
+    import tempfile
+    import threading
+    import time
+
+    with tempfile.NamedTemporaryFile(delete=False) as f:
+        block = os.urandom(1024 * 1024)
+        for _ in range(file_size // len(block)):
+            f.write(block)
+        path = f.name
+
+    listener = socket.create_server(('127.0.0.1', 0))
+    port = listener.getsockname()[1]
+    buffer = memoryview(bytearray(1024 * 1024))
+    try:
+        for name, serve in (("read+send", _serve_read_send), ("sendfile", _serve_sendfile)):
+            best, cpu = float('inf'), []
+            for _ in range(repeats):
+                def server():
+                    conn, _ = listener.accept()
+                    with conn:
+                        cpu_start = time.thread_time()
+                        serve(conn, path)
+                        cpu.append(time.thread_time() - cpu_start)
+
+                thread = threading.Thread(target=server)
+                thread.start()
+                with socket.create_connection(('127.0.0.1', port)) as client:
+                    start = time.perf_counter()
+                    while client.recv_into(buffer):
+                        pass
+                    best = min(best, time.perf_counter() - start)
+                thread.join()
+            print(f"{name:>10}: {file_size / best / 1e6:8.0f} MB/s, "
+                  f"sender CPU {min(cpu) * 1000:7.1f} ms")
+    finally:
+        listener.close()
+        os.unlink(path)
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,178 @@
+"""
+Length-Prefixed Message Framing
+
+TCP is a byte stream, not a message stream: a single recv(1024) may return
+part of a message, or parts of two. The usual fix is framing - every message
+is sent as a fixed-size length header followed by the payload, and the
+receiver reads exactly that many bytes.
+
+This module keeps the receive path allocation-free: FrameReader reads with
+recv_into() into one reusable bytearray and hands back a memoryview of it,
+and send_frame() uses sendmsg() scatter-gather so the header and payload go
+out in one system call without being concatenated first.
+"""
+
+import socket
+import struct
+
+# 4-byte unsigned big-endian ("network order") payload length.
+HEADER = struct.Struct('!I')
+MAX_FRAME_SIZE = 256 * 1024 * 1024
+
+# Request/response frames start with an 8-byte request id so several requests
+# can be pipelined over one connection and answered in any order.
+REQUEST_ID = struct.Struct('!Q')
+
+
+class FrameError(Exception):
+    """Raised when the peer sends a malformed frame or closes mid-frame."""
+
+
+# ==============================================================================
+# 1. Sending
+# ==============================================================================
+
+def send_frame(sock, payload):
+    """Send one frame: the length header followed by `payload` (bytes-like)."""
+    payload = memoryview(payload).cast('B')
+    if len(payload) > MAX_FRAME_SIZE:
+        raise FrameError(f"Frame of {len(payload)} bytes exceeds MAX_FRAME_SIZE")
+    header = HEADER.pack(len(payload))
+
+    if not hasattr(sock, 'sendmsg'):  # e.g. Windows
+        sock.sendall(header)
+        sock.sendall(payload)
+        return
+
+    # sendmsg() may send only part of the buffers; keep going from where it stopped.
+    buffers = [memoryview(header), payload]
+    while buffers:
+        sent = sock.sendmsg(buffers)
+        while buffers and sent >= len(buffers[0]):
+            sent -= len(buffers[0])
+            buffers.pop(0)
+        if buffers and sent:
+            buffers[0] = buffers[0][sent:]
+
+
+# ==============================================================================
+# 2. Receiving
+# ==============================================================================
+
+class FrameReader:
+    """
+    Reads frames from a socket into a single reusable buffer.
+
+    read_frame() returns a memoryview that is only valid until the next call;
+    use bytes(view) to keep a copy.
+    """
+
+    def __init__(self, sock, buffer_size=64 * 1024):
+        self._sock = sock
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+        self._header = bytearray(HEADER.size)
+
+    def _recv_exactly(self, view):
+        """Fill `view` completely. Returns False on a clean EOF before any byte."""
+        received = 0
+        while received < len(view):
+            n = self._sock.recv_into(view[received:])
+            if n == 0:
+                if received == 0:
+                    return False
+                raise FrameError("Connection closed in the middle of a frame")
+            received += n
+        return True
+
+    def read_frame(self):
+        """Return the next payload as a memoryview, or None if the peer closed."""
+        if not self._recv_exactly(memoryview(self._header)):
+            return None
+        (length,) = HEADER.unpack(self._header)
+        if length > MAX_FRAME_SIZE:
+            raise FrameError(f"Frame of {length} bytes exceeds MAX_FRAME_SIZE")
+
+        if length > len(self._buffer):
+            # Grow geometrically so a stream of large frames reallocates rarely.
+            self._buffer = bytearray(max(length, 2 * len(self._buffer)))
+            self._view = memoryview(self._buffer)
+
+        payload = self._view[:length]
+        if length and not self._recv_exactly(payload):
+            raise FrameError("Connection closed in the middle of a frame")
+        return payload
+
+    def __iter__(self):
+        while (frame := self.read_frame()) is not None:
+            yield frame
+
+
+def recv_frame(sock):
+    """Convenience helper for one-off reads: returns the payload as bytes (or None)."""
+    frame = FrameReader(sock, buffer_size=HEADER.size).read_frame()
+    return None if frame is None else bytes(frame)
+
+
+# ==============================================================================
+# 3. Throughput benchmark over loopback
+# ==============================================================================
+
+def _naive_read(sock, length):
+    """The unframed style: recv() into new bytes objects and join them."""
+    chunks, remaining = [], length
+    while remaining:
+        chunk = sock.recv(min(remaining, 65536))
+        if not chunk:
+            break
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(chunks)
+
+
+def benchmark(sizes=None, total_bytes=256 * 1024 * 1024):
+    """
+    Send frames of each size over loopback TCP and print MB/s for the
+    framed zero-copy reader and for a naive recv()-and-join reader.
+    """
+    import threading
+    import time
+
+    sizes = sizes or [1024, 16 * 1024, 256 * 1024, 1024 * 1024, 16 * 1024 * 1024, 64 * 1024 * 1024]
+
+    listener = socket.create_server(('127.0.0.1', 0))
+    port = listener.getsockname()[1]
+
+    print(f"{'size':>10} {'frames':>7} {'framed MB/s':>12} {'naive MB/s':>12}")
+    for size in sizes:
+        count = max(1, total_bytes // size)
+        payload = bytes(size)
+        results = {}
+        for style in ('framed', 'naive'):
+            def sender():
+                conn, _ = listener.accept()
+                with conn:
+                    for _ in range(count):
+                        send_frame(conn, payload)
+
+            thread = threading.Thread(target=sender)
+            thread.start()
+            with socket.create_connection(('127.0.0.1', port)) as client:
+                start = time.perf_counter()
+                if style == 'framed':
+                    reader = FrameReader(client)
+                    for _ in range(count):
+                        reader.read_frame()
+                else:
+                    for _ in range(count):
+                        _naive_read(client, HEADER.size)
+                        _naive_read(client, size)
+                elapsed = time.perf_counter() - start
+            thread.join()
+            results[style] = count * size / elapsed / 1e6
+        print(f"{size:>10} {count:>7} {results['framed']:>12.0f} {results['naive']:>12.0f}")
+    listener.close()
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,330 @@
+"""
+Load Testing for the Greeting Servers
+
+Opens many client connections concurrently, reads the greeting until the
+server closes the connection, and records how long each connection took.
+
+- run_load(): a quick fixed-count run on asyncio, used by the comparison
+  benchmarks in the other modules (connections/sec, p50/p99).
+- run_load_test(): the full harness. It drives N concurrent clients (asyncio
+  tasks or OS threads) for a fixed duration or request count. Latencies go
+  into an HDR-style histogram, and it reports p50/p90/p99/p99.9, throughput
+  and errors by type. Results can be saved as JSON so runs can be compared.
+
+    python load_generator.py 127.0.0.1 12345 --concurrency 200 --duration 10 --json run.json
+    python load_generator.py 127.0.0.1 12345 --duration 10 --compare run.json
+"""
+
+import asyncio
+import json
+import threading
+import time
+
+from Networking import GREETING
+
+
+def percentile(sorted_values, pct):
+    """Return the pct-th percentile (0-100) of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+# ==============================================================================
+# 1. HDR-style latency histogram
+# ==============================================================================
+
+class LatencyHistogram:
+    """
+    Log-linear histogram of latencies in microseconds, in the spirit of
+    HdrHistogram. Every power-of-two range is split into 2**precision_bits
+    linear sub-buckets, so memory stays small (a few thousand counters even
+    for hour-long latencies) while every recorded value keeps a relative
+    error below 1 / 2**precision_bits (under 1% with the default of 7).
+    """
+
+    def __init__(self, precision_bits=7):
+        self.precision_bits = precision_bits
+        self._sub_buckets = 1 << precision_bits
+        self.counts = {}  # bucket index -> count
+        self.total = 0
+        self.min = None
+        self.max = 0
+        self._sum = 0
+
+    def _index(self, value):
+        magnitude = max(0, value.bit_length() - self.precision_bits - 1)
+        return magnitude * self._sub_buckets + (value >> magnitude)
+
+    def _highest_value(self, index):
+        """Largest value that falls into bucket `index`."""
+        if index < 2 * self._sub_buckets:
+            return index
+        magnitude = index // self._sub_buckets - 1
+        sub = index - magnitude * self._sub_buckets
+        return ((sub + 1) << magnitude) - 1
+
+    def record(self, seconds):
+        value = max(0, int(seconds * 1e6))
+        index = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.total += 1
+        self._sum += value
+        self.max = max(self.max, value)
+        self.min = value if self.min is None else min(self.min, value)
+
+    def merge(self, other):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total += other.total
+        self._sum += other._sum
+        self.max = max(self.max, other.max)
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+
+    def value_at_percentile(self, pct):
+        """Latency in microseconds below which `pct` percent of samples fall."""
+        if not self.total:
+            return 0
+        target = max(1, int(round(pct / 100 * self.total)))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(self._highest_value(index), self.max)
+        return self.max
+
+    @property
+    def mean(self):
+        return self._sum / self.total if self.total else 0.0
+
+    def to_dict(self):
+        return {
+            'count': self.total,
+            'min_us': self.min or 0,
+            'mean_us': round(self.mean, 1),
+            'max_us': self.max,
+            'percentiles_us': {str(p): self.value_at_percentile(p) for p in (50, 90, 99, 99.9)},
+        }
+
+
+# ==============================================================================
+# 2. Quick fixed-count load (used by the comparison benchmarks)
+# ==============================================================================
+
+async def _one_connection(host, port, latencies, errors):
+    start = time.perf_counter()
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+        await reader.read()  # the server closes after the greeting
+        writer.close()
+        latencies.append(time.perf_counter() - start)
+    except OSError:
+        errors.append(1)
+
+
+async def _run_load(host, port, connections, concurrency):
+    latencies, errors = [], []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded():
+        async with semaphore:
+            await _one_connection(host, port, latencies, errors)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(bounded() for _ in range(connections)))
+    return latencies, len(errors), time.perf_counter() - start
+
+
+def run_load(host, port, connections=1000, concurrency=100):
+    """
+    Make `connections` greeting requests, at most `concurrency` in flight.
+    Returns a dict with throughput and latency figures (latencies in ms).
+    """
+    latencies, errors, elapsed = asyncio.run(_run_load(host, port, connections, concurrency))
+    latencies.sort()
+    return {
+        'connections': connections,
+        'errors': errors,
+        'elapsed_s': elapsed,
+        'connections_per_sec': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+    }
+
+
+def format_report(name, report):
+    return (f"{name:>10}: {report['connections_per_sec']:8.0f} conn/s  "
+            f"p50={report['p50_ms']:7.2f} ms  p99={report['p99_ms']:7.2f} ms  "
+            f"errors={report['errors']}")
+
+
+# ==============================================================================
+# 3. The load-testing harness
+# ==============================================================================
+
+class _Run:
+    """Shared state of one load test: the stop condition and error counters."""
+
+    def __init__(self, duration, requests):
+        self.deadline = time.monotonic() + duration if duration else None
+        self.remaining = requests
+        self.lock = threading.Lock()
+        self.errors = {}
+
+    def next_request(self):
+        with self.lock:
+            if self.deadline is not None and time.monotonic() >= self.deadline:
+                return False
+            if self.remaining is not None:
+                if self.remaining <= 0:
+                    return False
+                self.remaining -= 1
+            return True
+
+    def error(self, kind):
+        with self.lock:
+            self.errors[kind] = self.errors.get(kind, 0) + 1
+
+
+def _check(reply, run):
+    if reply != GREETING.encode('ascii'):
+        run.error('unexpected_response')
+        return False
+    return True
+
+
+async def _async_clients(host, port, concurrency, run, histogram):
+    async def client():
+        while run.next_request():
+            start = time.perf_counter()
+            try:
+                reader, writer = await asyncio.open_connection(host, port)
+                reply = await reader.read()
+                writer.close()
+            except OSError as e:
+                run.error(type(e).__name__)
+                continue
+            if _check(reply, run):
+                histogram.record(time.perf_counter() - start)
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+
+
+def _thread_client(host, port, run, histogram):
+    import socket
+    while run.next_request():
+        start = time.perf_counter()
+        try:
+            with socket.create_connection((host, port), timeout=10) as sock:
+                chunks = []
+                while chunk := sock.recv(1024):
+                    chunks.append(chunk)
+        except OSError as e:
+            run.error(type(e).__name__)
+            continue
+        if _check(b''.join(chunks), run):
+            histogram.record(time.perf_counter() - start)
+
+
+def run_load_test(host, port, concurrency=50, duration=None, requests=None, mode='asyncio'):
+    """
+    Drive `concurrency` clients until `duration` seconds pass or `requests`
+    requests have been made (whichever is given; default 10 seconds).
+    mode='asyncio' uses one event loop; mode='threads' uses one OS thread
+    per client. Returns a JSON-serialisable result dict.
+    """
+    if duration is None and requests is None:
+        duration = 10.0
+    run = _Run(duration, requests)
+    start = time.perf_counter()
+
+    if mode == 'asyncio':
+        histogram = LatencyHistogram()
+        asyncio.run(_async_clients(host, port, concurrency, run, histogram))
+    elif mode == 'threads':
+        # One histogram per thread, merged at the end: no lock on the hot path.
+        histograms = [LatencyHistogram() for _ in range(concurrency)]
+        threads = [threading.Thread(target=_thread_client, args=(host, port, run, h))
+                   for h in histograms]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        histogram = LatencyHistogram()
+        for h in histograms:
+            histogram.merge(h)
+    else:
+        raise ValueError(f"Unknown load mode: {mode!r}")
+
+    elapsed = time.perf_counter() - start
+    errors = sum(run.errors.values())
+    attempted = histogram.total + errors
+    return {
+        'target': f"{host}:{port}",
+        'mode': mode,
+        'concurrency': concurrency,
+        'started_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'elapsed_s': round(elapsed, 3),
+        'requests': attempted,
+        'throughput_rps': round(histogram.total / elapsed, 1) if elapsed else 0.0,
+        'error_rate': round(errors / attempted, 4) if attempted else 0.0,
+        'errors': run.errors,
+        'latency': histogram.to_dict(),
+    }
+
+
+def print_result(result):
+    latency = result['latency']
+    pct = latency['percentiles_us']
+    print(f"{result['target']} [{result['mode']}, {result['concurrency']} clients, "
+          f"{result['elapsed_s']} s]")
+    print(f"  throughput : {result['throughput_rps']:.0f} req/s over {result['requests']} requests")
+    print(f"  latency    : p50={pct['50'] / 1000:.2f} ms  p90={pct['90'] / 1000:.2f} ms  "
+          f"p99={pct['99'] / 1000:.2f} ms  p99.9={pct['99.9'] / 1000:.2f} ms  "
+          f"max={latency['max_us'] / 1000:.2f} ms")
+    print(f"  errors     : {result['error_rate']:.2%} {result['errors'] or ''}")
+
+
+def save_result(result, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(result, f, indent=2)
+
+
+def compare_results(baseline, result):
+    """Print how `result` differs from an earlier `baseline` run (both result dicts)."""
+    def change(old, new):
+        return f"{(new - old) / old:+.1%}" if old else "n/a"
+
+    print(f"  vs. baseline from {baseline['started_at']}:")
+    print(f"    throughput: {change(baseline['throughput_rps'], result['throughput_rps'])}")
+    for p in ('50', '99', '99.9'):
+        old = baseline['latency']['percentiles_us'][p]
+        new = result['latency']['percentiles_us'][p]
+        print(f"    p{p:<5}: {change(old, new)}")
+
+
+if __name__ == '__main__':
+    import argparse
+    from Networking import PORT
+
+    parser = argparse.ArgumentParser(description="Load-test a greeting server.")
+    parser.add_argument('host', nargs='?', default='127.0.0.1')
+    parser.add_argument('port', nargs='?', type=int, default=PORT)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--duration', type=float, help="seconds to run (default 10)")
+    parser.add_argument('--requests', type=int, help="stop after this many requests")
+    parser.add_argument('--mode', choices=('asyncio', 'threads'), default='asyncio')
+    parser.add_argument('--json', metavar='PATH', help="also write the result as JSON")
+    parser.add_argument('--compare', metavar='PATH', help="compare with an earlier JSON result")
+    args = parser.parse_args()
+
+    result = run_load_test(args.host, args.port, args.concurrency, args.duration,
+                           args.requests, args.mode)
+    print_result(result)
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare_results(json.load(f), result)
+    if args.json:
+        save_result(result, args.json)
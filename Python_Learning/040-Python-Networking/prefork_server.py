@@ -0,0 +1,218 @@
+"""
+Pre-Forked Multi-Process Server with SO_REUSEPORT
+
+One Python process runs one event loop on one core. To use every core, the
+master process starts N worker processes and each one opens its own
+listening socket on the same port with SO_REUSEPORT. The Linux kernel then
+load-balances incoming connections across the workers' accept queues, so
+there is no shared accept lock and no hand-off through the master.
+
+- Shared shutdown: one multiprocessing.Event tells every worker to stop.
+- Graceful restart: workers are replaced one at a time (start the new one,
+  then ask the old one to stop), so the port is never left without a
+  listener. Send SIGHUP to the master to trigger it.
+- Supervision: a worker that dies unexpectedly is replaced.
+
+SO_REUSEPORT is available on Linux 3.9+ and recent BSDs; it is not on Windows.
+"""
+
+import asyncio
+import multiprocessing
+import os
+import signal
+import socket
+import time
+
+from async_server import BACKLOG, handle_framed_greeting, handle_greeting, make_greeting_handler
+from Networking import PORT
+
+
+# ==============================================================================
+# 1. A worker process
+# ==============================================================================
+
+def _worker_main(host, port, shutdown, stop, delay, framed, backlog):
+    """Entry point of a worker: serve until the shared or own stop event is set."""
+    # The master handles the signals; workers are told to stop via the events.
+    # The forked worker inherits the master's SIGTERM handler, which would stop
+    # the whole server: SIGTERM to a worker stops only that worker. The
+    # handler only sets a plain flag; calling Event.set() from a signal
+    # handler could deadlock on the lock the main loop's is_set() holds.
+    terminated = False
+
+    def on_sigterm(*_):
+        nonlocal terminated
+        terminated = True
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, on_sigterm)
+    if framed:
+        handler = handle_framed_greeting
+    elif delay:
+        handler = make_greeting_handler(delay)
+    else:
+        handler = handle_greeting
+
+    async def main():
+        server = await asyncio.start_server(handler, host, port, backlog=backlog,
+                                            reuse_port=True)
+        while not (terminated or shutdown.is_set() or stop.is_set()):
+            await asyncio.sleep(0.1)
+        # Stop accepting, then give in-flight connections a moment to finish.
+        server.close()
+        await server.wait_closed()
+        await asyncio.sleep(0.2)
+
+    asyncio.run(main())
+
+
+# ==============================================================================
+# 2. The master process
+# ==============================================================================
+
+class PreforkServer:
+    """Starts, supervises and restarts `workers` server processes."""
+
+    def __init__(self, host=None, port=PORT, workers=None, delay=0.0, framed=False, backlog=None):
+        if not hasattr(socket, 'SO_REUSEPORT'):
+            raise OSError("SO_REUSEPORT is not supported on this platform")
+        self.host = host or socket.gethostname()
+        self.port = port
+        self.num_workers = workers or os.cpu_count() or 1
+        self.delay = delay
+        self.framed = framed
+        self.backlog = BACKLOG if backlog is None else backlog
+        self._ctx = multiprocessing.get_context('fork')
+        self.shutdown = self._ctx.Event()
+        self._workers = []  # [(process, stop_event)]
+        self._restart_requested = False
+        self._stop_requested = False  # set by SIGTERM; the loop then sets `shutdown`
+
+    def _spawn(self):
+        stop = self._ctx.Event()
+        process = self._ctx.Process(target=_worker_main, name="PreforkWorker", daemon=True,
+                                    args=(self.host, self.port, self.shutdown, stop,
+                                          self.delay, self.framed, self.backlog))
+        process.start()
+        return process, stop
+
+    def start(self):
+        self._workers = [self._spawn() for _ in range(self.num_workers)]
+        # Wait until the port accepts connections. With SO_REUSEPORT a probe
+        # cannot pick its worker, so this means at least one worker is up.
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            try:
+                socket.create_connection((self.host, self.port), timeout=1).close()
+                break
+            except OSError:
+                time.sleep(0.05)
+
+    def restart_workers(self):
+        """Replace the workers one by one without closing the port."""
+        for i, (old, old_stop) in enumerate(list(self._workers)):
+            self._workers[i] = self._spawn()
+            time.sleep(0.2)  # let the new worker bind before the old one leaves
+            old_stop.set()
+            old.join(timeout=5)
+        print(f"Restarted {len(self._workers)} workers.")
+
+    def supervise(self):
+        """Replace crashed workers until shutdown is requested."""
+        for i, (process, stop) in enumerate(self._workers):
+            if not process.is_alive() and not self.shutdown.is_set():
+                print(f"Worker {process.pid} exited with {process.exitcode}; restarting.")
+                self._workers[i] = self._spawn()
+
+    def stop(self):
+        self.shutdown.set()
+        for process, _ in self._workers:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        self._workers = []
+
+    def serve_forever(self):
+        """Run until SIGINT/SIGTERM; SIGHUP performs a graceful restart."""
+        # Signal handlers only set plain attributes (see _worker_main)
+        signal.signal(signal.SIGTERM, lambda *_: setattr(self, '_stop_requested', True))
+        signal.signal(signal.SIGHUP, lambda *_: setattr(self, '_restart_requested', True))
+        self.start()
+        print(f"Pre-fork server on {self.host}:{self.port} with {self.num_workers} workers "
+              f"(master pid {os.getpid()})")
+        try:
+            while not (self._stop_requested or self.shutdown.is_set()):
+                if self._restart_requested:
+                    self._restart_requested = False
+                    self.restart_workers()
+                self.supervise()
+                time.sleep(0.2)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+            print("Pre-fork server stopped.")
+
+
+def run_prefork_server(host=None, port=PORT, workers=None, framed=False, backlog=None):
+    """This is what run_server(mode='prefork') calls."""
+    PreforkServer(host, port, workers, framed=framed, backlog=backlog).serve_forever()
+
+
+# ==============================================================================
+# 3. Scaling benchmark: throughput vs. worker count
+# ==============================================================================
+
+def _load_process(port, connections, concurrency, results):
+    from load_generator import run_load
+    results.put(run_load('127.0.0.1', port, connections, concurrency))
+
+
+def benchmark(worker_counts=None, connections=2000, concurrency=200, delay=0.002):
+    """
+    Print connections/sec for each worker count. The load comes from several
+    client processes so that the client side is not the bottleneck; `delay`
+    adds simulated I/O per connection.
+    """
+    cpus = os.cpu_count() or 1
+    worker_counts = worker_counts or sorted({1, 2, 4, cpus})
+    clients = max(2, cpus // 2)
+    ctx = multiprocessing.get_context('fork')
+
+    print(f"{'workers':>7} {'conn/s':>9} {'p99 ms':>8}")
+    for workers in worker_counts:
+        server = PreforkServer('127.0.0.1', _free_port(), workers, delay)
+        server.start()
+        try:
+            results = ctx.Queue()
+            procs = [ctx.Process(target=_load_process,
+                                 args=(server.port, connections // clients, concurrency, results))
+                     for _ in range(clients)]
+            start = time.perf_counter()
+            for p in procs:
+                p.start()
+            reports = [results.get() for _ in procs]
+            for p in procs:
+                p.join()
+            elapsed = time.perf_counter() - start
+        finally:
+            server.stop()
+        done = sum(r['connections'] - r['errors'] for r in reports)
+        p99 = max(r['p99_ms'] for r in reports)
+        print(f"{workers:>7} {done / elapsed:>9.0f} {p99:>8.1f}")
+
+
+def _free_port():
+    """Pick an unused port (the workers must all bind the same explicit port)."""
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+if __name__ == '__main__':
+    import sys
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        run_prefork_server(workers=int(sys.argv[2]) if len(sys.argv) > 2 else None)
+    else:
+        benchmark()
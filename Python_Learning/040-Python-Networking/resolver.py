@@ -0,0 +1,138 @@
+"""
+Cached Hostname Resolution
+
+Connecting to socket.gethostname() or any other name means a getaddrinfo()
+lookup first. Depending on the system that means reading /etc/hosts, asking
+nscd or systemd-resolved, or a DNS round trip. Under high connection churn
+the same name is resolved over and over. CachingResolver keeps results:
+
+- positive answers for `ttl` seconds,
+- failures ("negative caching") for `negative_ttl` seconds, so a bad name
+  does not trigger a slow lookup on every attempt.
+
+One shared instance, default_resolver, is used by the socket client and
+server in Networking.py, the connection pool and the URL fetcher.
+getaddrinfo() does not report DNS TTLs, so the TTL is a fixed setting.
+"""
+
+import socket
+import threading
+import time
+
+
+class CachingResolver:
+    """A getaddrinfo() cache with TTL, negative caching and hit/miss metrics."""
+
+    def __init__(self, ttl=60.0, negative_ttl=5.0, max_entries=1024):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._cache = {}  # key -> (expires_at, addrinfo list or gaierror)
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'negative_hits': 0, 'lookup_seconds': 0.0}
+
+    def getaddrinfo(self, host, port, family=0, type=socket.SOCK_STREAM, flags=0):
+        """Like socket.getaddrinfo(), but served from the cache while fresh."""
+        key = (host, port, family, type, flags)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] > now:
+                if isinstance(entry[1], Exception):
+                    self.stats['negative_hits'] += 1
+                    raise socket.gaierror(*entry[1].args)
+                self.stats['hits'] += 1
+                return entry[1]
+
+        start = time.perf_counter()
+        try:
+            result = socket.getaddrinfo(host, port, family, type, 0, flags)
+            expires = self.ttl
+        except socket.gaierror as e:
+            result = e
+            expires = self.negative_ttl
+        elapsed = time.perf_counter() - start
+
+        with self._lock:
+            self.stats['misses'] += 1
+            self.stats['lookup_seconds'] += elapsed
+            if len(self._cache) >= self.max_entries:
+                self._evict(now)
+            self._cache[key] = (time.monotonic() + expires, result)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def _evict(self, now):
+        """Drop expired entries, or the oldest half if nothing has expired."""
+        expired = [k for k, (expires, _) in self._cache.items() if expires <= now]
+        if not expired:
+            expired = sorted(self._cache, key=lambda k: self._cache[k][0])[:len(self._cache) // 2]
+        for key in expired:
+            del self._cache[key]
+
+    def create_connection(self, address, timeout=socket._GLOBAL_DEFAULT_TIMEOUT,
+                          source_address=None):
+        """socket.create_connection() that resolves through the cache."""
+        host, port = address
+        error = None
+        for family, type_, proto, _, sockaddr in self.getaddrinfo(host, port):
+            sock = socket.socket(family, type_, proto)
+            try:
+                if timeout is not socket._GLOBAL_DEFAULT_TIMEOUT:
+                    sock.settimeout(timeout)
+                if source_address:
+                    sock.bind(source_address)
+                sock.connect(sockaddr)
+                return sock
+            except OSError as e:
+                error = e
+                sock.close()
+        raise error or OSError(f"getaddrinfo returned no addresses for {host}")
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def metrics(self):
+        """Hit rate and an estimate of the lookup time the cache saved."""
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats['hits'] + stats['negative_hits'] + stats['misses']
+        avg_miss = stats['lookup_seconds'] / stats['misses'] if stats['misses'] else 0.0
+        stats['hit_rate'] = (stats['hits'] + stats['negative_hits']) / lookups if lookups else 0.0
+        stats['saved_seconds'] = (stats['hits'] + stats['negative_hits']) * avg_miss
+        return stats
+
+
+default_resolver = CachingResolver()
+
+
+def resolve(host, port, type=socket.SOCK_STREAM):
+    """Resolve with the shared cache; returns the getaddrinfo() list."""
+    return default_resolver.getaddrinfo(host, port, type=type)
+
+
+def create_connection(address, timeout=socket._GLOBAL_DEFAULT_TIMEOUT, source_address=None):
+    """Drop-in replacement for socket.create_connection() using the shared cache."""
+    return default_resolver.create_connection(address, timeout, source_address)
+
+
+if __name__ == '__main__':
+    name = socket.gethostname()
+    resolver = CachingResolver()
+    start = time.perf_counter()
+    for _ in range(1000):
+        socket.getaddrinfo(name, 80, type=socket.SOCK_STREAM)
+    uncached = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(1000):
+        resolver.getaddrinfo(name, 80)
+    cached = time.perf_counter() - start
+    print(f"1000 lookups of {name!r}: uncached {uncached * 1000:.1f} ms, cached {cached * 1000:.1f} ms")
+    for _ in range(3):
+        try:
+            resolver.getaddrinfo('no-such-host.invalid', 80)
+        except socket.gaierror:
+            pass
+    print(resolver.metrics())
@@ -0,0 +1,128 @@
+"""
+Transport Latency: Unix Domain Socket vs. Loopback TCP vs. Hostname TCP
+
+When client and server run on the same host, TCP still goes through the whole
+TCP/IP stack (checksums, congestion control, loopback device). An AF_UNIX
+socket hands the bytes from one process's buffer to the other's directly.
+
+Two measurements per transport:
+- connect + greeting: the run_client() pattern, one short connection per request
+- round trip: ping-pong of a small message over one open connection
+
+The "hostname" transport is the original path: socket.gethostname() is
+resolved on every connection. "hostname-cached" is the same TCP path with
+the lookup served from the shared resolver cache (see resolver.py), which
+is what create_client_socket() does now.
+"""
+
+import os
+import socket
+import tempfile
+import threading
+import time
+
+from load_generator import percentile
+from Networking import create_client_socket, create_server_socket, serve_blocking
+
+
+def _echo_loop(server_socket):
+    """Echo every message back until the client disconnects."""
+    while True:
+        try:
+            conn, _ = server_socket.accept()
+        except OSError:
+            return
+        with conn:
+            while data := conn.recv(4096):
+                conn.sendall(data)
+
+
+def _start(target, server_socket):
+    def runner():
+        try:
+            target(server_socket)
+        except OSError:
+            pass  # the listening socket was closed at the end of the run
+    threading.Thread(target=runner, daemon=True).start()
+
+
+def _summary(samples):
+    samples.sort()
+    return percentile(samples, 50) * 1e6, percentile(samples, 99) * 1e6
+
+
+def benchmark(requests=2000, round_trips=20000, message=b'x' * 64):
+    tmpdir = tempfile.mkdtemp()
+    greeting_uds = os.path.join(tmpdir, 'greeting.sock')
+    echo_uds = os.path.join(tmpdir, 'echo.sock')
+    hostname = socket.gethostname()
+
+    # Greeting and echo servers for every transport.
+    servers = []
+    transports = {}
+    for name, host, path in (("unix", None, greeting_uds),
+                             ("loopback", '127.0.0.1', None),
+                             ("hostname", hostname, None)):
+        greeting = create_server_socket(host or '', 0, path, backlog=128)
+        _start(lambda s: serve_blocking(s, verbose=False), greeting)
+        servers.append(greeting)
+        port = 0 if path else greeting.getsockname()[1]
+        transports[name] = (host, port, path)
+    transports['hostname-cached'] = transports['hostname']
+
+    echo_unix = create_server_socket(None, 0, echo_uds, backlog=8)
+    echo_tcp = create_server_socket('127.0.0.1', 0, backlog=8)
+    for s in (echo_unix, echo_tcp):
+        _start(_echo_loop, s)
+        servers.append(s)
+
+    try:
+        print(f"{'transport':>15} {'connect+greeting p50/p99 (us)':>32}")
+        for name, (host, port, path) in transports.items():
+            samples = []
+            for _ in range(requests):
+                start = time.perf_counter()
+                if name == 'hostname':
+                    # Resolve the machine name on every call, bypassing the cache.
+                    family, _, _, _, address = socket.getaddrinfo(
+                        socket.gethostname(), port, type=socket.SOCK_STREAM)[0]
+                    sock = socket.socket(family, socket.SOCK_STREAM)
+                    sock.connect(address)
+                else:
+                    sock = create_client_socket(host, port, path)
+                while sock.recv(1024):
+                    pass
+                sock.close()
+                samples.append(time.perf_counter() - start)
+            p50, p99 = _summary(samples)
+            print(f"{name:>15} {p50:>15.1f} / {p99:<15.1f}")
+
+        print(f"\n{'transport':>15} {'round trip p50/p99 (us)':>32}")
+        for name, host, port, path in (("unix", None, 0, echo_uds),
+                                       ("loopback", '127.0.0.1', echo_tcp.getsockname()[1], None)):
+            sock = create_client_socket(host, port, path)
+            if not path:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            buffer = bytearray(len(message))
+            samples = []
+            for _ in range(round_trips):
+                start = time.perf_counter()
+                sock.sendall(message)
+                received = 0
+                while received < len(message):
+                    received += sock.recv_into(memoryview(buffer)[received:])
+                samples.append(time.perf_counter() - start)
+            sock.close()
+            p50, p99 = _summary(samples)
+            print(f"{name:>15} {p50:>15.1f} / {p99:<15.1f}")
+    finally:
+        for s in servers:
+            s.close()
+        for path in (greeting_uds, echo_uds):
+            if os.path.exists(path):
+                os.unlink(path)
+        os.rmdir(tmpdir)
+
+
+if __name__ == '__main__':
+    benchmark()
@@ -0,0 +1,277 @@
+"""
+Concurrent URL Fetching with Keep-Alive and an HTTP Cache
+
+fetch_url_data() and submit_data_to_form() in Networking.py make one blocking
+urlopen() call each. urlopen() opens a fresh connection per request and never
+reuses anything. For many URLs this module adds:
+
+- Bounded concurrency: a thread pool fetches several URLs at once, and a
+  per-host semaphore keeps us from hammering any single server.
+- Keep-alive: every worker thread keeps one http.client connection per host
+  and reuses it for later requests to that host.
+- Conditional GETs: responses carrying an ETag or Last-Modified header are
+  stored in an on-disk cache. The next request sends If-None-Match /
+  If-Modified-Since, and a "304 Not Modified" reply is served from the cache
+  without downloading the body again.
+
+Every result reports its latency, and the fetcher counts bytes saved by the cache.
+"""
+
+import hashlib
+import http.client
+import json
+import os
+import threading
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+
+from resolver import default_resolver
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status: int = 0
+    body: bytes = b''
+    from_cache: bool = False
+    latency: float = 0.0
+    error: str = None
+
+
+# ==============================================================================
+# 1. The on-disk response cache
+# ==============================================================================
+
+class DiskCache:
+    """Stores each response as <key>.body plus its validators in <key>.json."""
+
+    def __init__(self, directory='.http_cache'):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.directory, key)
+        return base + '.json', base + '.body'
+
+    def get(self, url):
+        """Return (metadata, body) or (None, None) if the URL is not cached."""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                return meta, f.read()
+        except (OSError, ValueError):
+            return None, None
+
+    def put(self, url, meta, body):
+        meta_path, body_path = self._paths(url)
+        # Write to temporary files and rename, so readers never see half a file.
+        for path, data, mode in ((body_path, body, 'wb'), (meta_path, json.dumps(meta), 'w')):
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, mode) as f:
+                f.write(data)
+            os.replace(tmp, path)
+
+
+# ==============================================================================
+# 2. The fetcher
+# ==============================================================================
+
+class _CachedResolution:
+    """Makes connect() resolve the host through the shared DNS cache."""
+
+    def connect(self):
+        # HTTPConnection.connect() opens its socket with self._create_connection;
+        # HTTPSConnection.connect() calls it and then wraps the socket in TLS.
+        self._create_connection = default_resolver.create_connection
+        try:
+            super().connect()
+        finally:
+            del self._create_connection
+
+
+class _HTTPConnection(_CachedResolution, http.client.HTTPConnection):
+    pass
+
+
+class _HTTPSConnection(_CachedResolution, http.client.HTTPSConnection):
+    pass
+
+
+class URLFetcher:
+    """Fetches batches of URLs concurrently, reusing connections and cached bodies."""
+
+    def __init__(self, max_workers=8, max_per_host=4, cache_dir='.http_cache', timeout=10):
+        self.max_workers = max_workers
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.cache = DiskCache(cache_dir) if cache_dir else None
+        self._local = threading.local()  # per-thread {(scheme, netloc): connection}
+        self._host_limits = {}
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'not_modified': 0, 'bytes_downloaded': 0,
+                      'bytes_saved': 0, 'connections_opened': 0}
+        # Long-lived workers, so their keep-alive connections survive between batches.
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="URLFetcher")
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self.stats[name] += amount
+
+    def _host_limit(self, netloc):
+        with self._lock:
+            if netloc not in self._host_limits:
+                self._host_limits[netloc] = threading.BoundedSemaphore(self.max_per_host)
+            return self._host_limits[netloc]
+
+    def _connection(self, scheme, netloc, fresh=False):
+        """Return this thread's keep-alive connection to the host."""
+        connections = self._local.__dict__.setdefault('connections', {})
+        key = (scheme, netloc)
+        if fresh and key in connections:
+            connections.pop(key).close()
+        if key not in connections:
+            cls = _HTTPSConnection if scheme == 'https' else _HTTPConnection
+            conn = cls(netloc, timeout=self.timeout)
+            connections[key] = conn
+            self._count('connections_opened')
+        return connections[key]
+
+    def _request(self, parts, method, path, body, headers):
+        # A kept-alive connection may have been closed by the server while idle;
+        # in that case retry once on a new connection.
+        for attempt in range(2):
+            conn = self._connection(parts.scheme, parts.netloc, fresh=attempt > 0)
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                # The body must be read completely before the connection can be reused.
+                return response, response.read()
+            except BaseException as e:
+                # A timeout or any other error can leave the connection in the
+                # middle of a request; it must not be reused.
+                self._local.connections.pop((parts.scheme, parts.netloc), None)
+                conn.close()
+                retry = isinstance(e, (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError))
+                if attempt or not retry:
+                    raise
+
+    def fetch(self, url, data=None):
+        """Fetch one URL (POST if `data` is given). Never raises; see FetchResult.error."""
+        start = time.perf_counter()
+        parts = urllib.parse.urlsplit(url)
+        path = urllib.parse.urlunsplit(('', '', parts.path or '/', parts.query, ''))
+        method = 'POST' if data is not None else 'GET'
+        headers = {'Connection': 'keep-alive'}
+        if data is not None:
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+
+        meta, cached_body = (None, None)
+        if self.cache and method == 'GET':
+            meta, cached_body = self.cache.get(url)
+            if meta:
+                if meta.get('etag'):
+                    headers['If-None-Match'] = meta['etag']
+                if meta.get('last_modified'):
+                    headers['If-Modified-Since'] = meta['last_modified']
+
+        result = FetchResult(url)
+        try:
+            with self._host_limit(parts.netloc):
+                response, body = self._request(parts, method, path, data, headers)
+            self._count('requests')
+            self._count('bytes_downloaded', len(body))
+            if response.status == 304 and cached_body is not None:
+                self._count('not_modified')
+                self._count('bytes_saved', len(cached_body))
+                result.status, result.body, result.from_cache = meta['status'], cached_body, True
+            else:
+                result.status, result.body = response.status, body
+                etag, last_modified = response.getheader('ETag'), response.getheader('Last-Modified')
+                if self.cache and method == 'GET' and response.status == 200 and (etag or last_modified):
+                    self.cache.put(url, {'status': 200, 'etag': etag,
+                                         'last_modified': last_modified}, body)
+        except (OSError, http.client.HTTPException) as e:
+            result.error = f"{type(e).__name__}: {e}"
+        result.latency = time.perf_counter() - start
+        return result
+
+    def fetch_many(self, urls):
+        """Fetch all `urls` concurrently; results come back in the same order."""
+        return list(self._executor.map(self.fetch, urls))
+
+    def close(self):
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def fetch_urls(urls, **kwargs):
+    """One-shot helper: fetch a batch of URLs with a fresh URLFetcher."""
+    with URLFetcher(**kwargs) as fetcher:
+        return fetcher.fetch_many(urls)
+
+
+# ==============================================================================
+# 3. Demo against a local http.server stand-in
+# ==============================================================================
+
+def start_local_http_server(directory):
+    """Serve `directory` over HTTP/1.1 (keep-alive) on a free loopback port."""
+    import functools
+    from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+    class KeepAliveHandler(SimpleHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+    handler = functools.partial(KeepAliveHandler, directory=directory)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def demo(files=50, file_size=64 * 1024):
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as site, tempfile.TemporaryDirectory() as cache_dir:
+        for i in range(files):
+            with open(os.path.join(site, f"page{i}.html"), 'wb') as f:
+                f.write(os.urandom(file_size))
+        server = start_local_http_server(site)
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        urls = [f"{base}/page{i}.html" for i in range(files)]
+
+        start = time.perf_counter()
+        for url in urls:
+            with urllib.request.urlopen(url) as response:
+                response.read()
+        print(f"serial urlopen : {time.perf_counter() - start:.3f} s")
+
+        fetcher = URLFetcher(max_workers=8, cache_dir=cache_dir)
+        for run in ('cold cache', 'warm cache'):
+            start = time.perf_counter()
+            results = fetcher.fetch_many(urls)
+            elapsed = time.perf_counter() - start
+            latencies = sorted(r.latency for r in results)
+            print(f"{run:<15}: {elapsed:.3f} s, median latency "
+                  f"{latencies[len(latencies) // 2] * 1000:.2f} ms, "
+                  f"{sum(r.from_cache for r in results)} served from cache")
+        print(f"stats: {fetcher.stats}")
+        fetcher.close()
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    demo()
@@ -73,15 +73,22 @@ This file contains notes on accessing various databases with Python.
 
 import sqlite3
 
-def sqlite_example():
+def sqlite_example(pool=None):
     """
     A simple example demonstrating the DB-API using the built-in sqlite3 module.
+
+    Pass a db_pool.SQLitePool to borrow an open connection from it instead of
+    connecting (and closing) on every call.
     """
     # 1. Create a connection object.
     # This will create a file named 'example.db' if it doesn't exist.
     try:
-        conn = sqlite3.connect('example.db')
-        print("Successfully connected to the database.")
+        if pool is None:
+            conn = sqlite3.connect('example.db')
+            print("Successfully connected to the database.")
+        else:
+            conn = pool.acquire()
+            print("Borrowed a connection from the pool.")
 
         # 2. Create a cursor object.
         cursor = conn.cursor()
@@ -116,9 +123,14 @@ def sqlite_example():
         # fetchone() - retrieves the next row of a query result set
         # fetchall() - fetches all (remaining) rows of a query result
         # fetchmany(size) - retrieves the next set of rows of a query result
-        all_users = cursor.fetchall()
-        for user in all_users:
-            print(f"ID: {user[0]}, Name: {user[1]}, Email: {user[2]}")
+        # fetchall() would hold every row in memory at once; fetchmany() keeps
+        # only one batch, however large the table grows (see db_stream.py).
+        while True:
+            users = cursor.fetchmany(500)
+            if not users:
+                break
+            for user in users:
+                print(f"ID: {user[0]}, Name: {user[1]}, Email: {user[2]}")
 
     except sqlite3.Error as e:
         print(f"Database error: {e}")
@@ -126,8 +138,13 @@ def sqlite_example():
         # 6. Close the connection.
         # The cursor is automatically closed when the connection is closed.
         if 'conn' in locals() and conn:
-            conn.close()
-            print("\nDatabase connection closed.")
+            if pool is None:
+                conn.close()
+                print("\nDatabase connection closed.")
+            else:
+                # Returned open, ready for the next caller
+                pool.release(conn)
+                print("\nConnection returned to the pool.")
 
 if __name__ == '__main__':
     sqlite_example()
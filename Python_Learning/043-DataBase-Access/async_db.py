@@ -0,0 +1,434 @@
+"""
+Asyncio Access to SQLite
+
+The sqlite3 module is blocking: calling it from a coroutine stops the whole
+event loop until the query finishes, and every other task waits. AsyncDatabase
+runs all SQLite work on dedicated threads and hands results back to the loop:
+
+- One writer thread owns the only write connection (SQLite allows one writer
+  at a time anyway). Writes that queue up while it is busy are batched into a
+  single transaction: one commit, one fsync, for the whole batch. Each write
+  runs inside its own SAVEPOINT, so a failing write is rolled back alone and
+  only its caller sees the error. `await db.execute(...)` returns after the
+  commit, so the data is durable by then. Statements that SQLite refuses
+  inside a transaction (VACUUM, ATTACH/DETACH, PRAGMA, BEGIN/COMMIT/...)
+  are not batched: they run on their own, between batches.
+- `readers` reader threads, each with its own connection (created on that
+  thread, so SQLite's thread affinity is respected), serve SELECTs. In WAL
+  mode they read while the writer writes. Reader connections are
+  query_only: a WITH statement is tried on a reader, and if it turns out to
+  be a write (WITH ... DELETE/INSERT/UPDATE) SQLite refuses it before it
+  changes anything and it is handed to the writer.
+- `async for row in db.stream(...)` fetches rows in fetchmany() batches, one
+  batch ahead of the consumer. Every batch is a separate job on the read
+  queue, so an open stream does not hold a reader thread while the consumer
+  works, and other queries can run inside the `async for` loop. A stream
+  uses its own connection, which moves between the reader threads but is
+  only ever used by one of them at a time.
+"""
+
+import asyncio
+import os
+import queue
+import re
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from db_pool import DEFAULT_PRAGMAS
+
+_READ_PREFIXES = ('select', 'with', 'explain', 'values')
+
+
+def _is_read(sql):
+    return sql.lstrip().lower().startswith(_READ_PREFIXES)
+
+
+def _is_with(sql):
+    return sql.lstrip()[:4].lower() == 'with'
+
+
+def _rowcount(conn, cursor, sql):
+    # sqlite3 reports -1 for a WITH ... DELETE/INSERT/UPDATE; changes() knows
+    if cursor.rowcount == -1 and _is_with(sql):
+        return conn.execute("SELECT changes()").fetchone()[0]
+    return cursor.rowcount
+
+
+_UNBATCHED = re.compile(r'\s*(?:vacuum|attach|detach|pragma|begin|commit|end|rollback|savepoint|release)\b',
+                        re.IGNORECASE)
+
+
+def _refused_write(error):
+    # What a query_only connection says when a statement tries to write
+    return isinstance(error, sqlite3.OperationalError) and 'readonly' in str(error)
+
+
+def _deliver(loop, future, result=None, error=None):
+    """Complete an asyncio future from a database thread."""
+    def complete():
+        if future.cancelled():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    loop.call_soon_threadsafe(complete)
+
+
+class _Stream:
+    """State of one db.stream() call, shared by its fetch jobs."""
+
+    def __init__(self, sql, params, batch_size, batches, loop):
+        self.sql = sql
+        self.params = params
+        self.batch_size = batch_size
+        self.batches = batches
+        self.loop = loop
+        self.lock = threading.Lock()  # one reader thread at a time touches conn/cursor
+        self.conn = self.cursor = None
+        self.closed = False
+
+    def send(self, kind, payload=None):
+        self.loop.call_soon_threadsafe(self.batches.put_nowait, (kind, payload))
+
+    def close(self):
+        """Called with self.lock held."""
+        self.closed = True
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = self.cursor = None
+
+
+class AsyncDatabase:
+    def __init__(self, database, readers=2, max_batch=256, pragmas=None):
+        self.database = database
+        self.max_batch = max_batch
+        self.pragmas = DEFAULT_PRAGMAS if pragmas is None else pragmas
+        self._writes = queue.Queue()
+        self._reads = queue.Queue()
+        self._closed = False
+        self._submit_lock = threading.Lock()  # nothing is queued after close()'s sentinels
+        self.stats = {'writes': 0, 'write_batches': 0, 'reads': 0}
+        self._threads = [threading.Thread(target=self._writer, name="db-writer", daemon=True)]
+        self._threads += [threading.Thread(target=self._reader, name=f"db-reader-{i}", daemon=True)
+                          for i in range(readers)]
+        for t in self._threads:
+            t.start()
+
+    def _connect(self, check_same_thread=True, read_only=False):
+        # isolation_level=None: no implicit BEGIN, transactions are explicit
+        conn = sqlite3.connect(self.database, isolation_level=None, check_same_thread=check_same_thread)
+        try:
+            for name, value in self.pragmas.items():
+                conn.execute(f"PRAGMA {name}={value}")
+            if read_only:
+                conn.execute("PRAGMA query_only=1")
+        except BaseException:
+            conn.close()
+            raise
+        return conn
+
+    # ---- the API -----------------------------------------------------------
+
+    async def execute(self, sql, params=()):
+        """
+        Reads (SELECT/WITH/...) return the list of rows; anything else is a
+        write and returns the cursor's rowcount once committed. A WITH that
+        ends in DELETE/INSERT/UPDATE is a write.
+        """
+        future = asyncio.get_running_loop().create_future()
+        if _is_read(sql):
+            self._submit(self._reads, ('fetch', (sql, params, future, asyncio.get_running_loop())))
+        else:
+            self._submit(self._writes, (False, sql, params, future, asyncio.get_running_loop()))
+        return await future
+
+    async def executemany(self, sql, seq_of_params):
+        future = asyncio.get_running_loop().create_future()
+        self._submit(self._writes, (True, sql, list(seq_of_params), future, asyncio.get_running_loop()))
+        return await future
+
+    async def fetchone(self, sql, params=()):
+        rows = await self.execute(sql, params)
+        return rows[0] if rows else None
+
+    async def stream(self, sql, params=(), batch_size=500):
+        """async for row in db.stream(sql): ... with constant memory."""
+        batches = asyncio.Queue()
+        state = _Stream(sql, params, batch_size, batches, asyncio.get_running_loop())
+        self._submit(self._reads, ('stream', state))
+        try:
+            while True:
+                kind, payload = await batches.get()
+                if kind == 'error':
+                    raise payload
+                if kind == 'done':
+                    return
+                self._submit(self._reads, ('stream', state))  # fetch the next batch while we use this one
+                for row in payload:
+                    yield row
+        finally:
+            try:
+                self._submit(self._reads, ('close', state))
+            except sqlite3.ProgrammingError:
+                with state.lock:  # no reader will run it any more
+                    state.close()
+
+    def _submit(self, jobs, job):
+        with self._submit_lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+            jobs.put(job)
+
+    async def close(self):
+        """
+        Finish the queued work and stop the threads. Work submitted later,
+        including the next batch of a stream that is still being consumed,
+        raises sqlite3.ProgrammingError.
+        """
+        with self._submit_lock:
+            if self._closed:
+                return
+            self._closed = True
+            for _ in self._threads[1:]:
+                self._reads.put(None)
+
+        def stop():
+            # Readers first: they may still hand a WITH ... write to the writer
+            for t in self._threads[1:]:
+                t.join()
+            self._writes.put(None)
+            self._threads[0].join()
+        await asyncio.to_thread(stop)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    # ---- database threads --------------------------------------------------
+
+    def _writer(self):
+        conn = self._connect()
+        held = None  # an unbatched statement that ended the previous batch
+        while True:
+            item, held = held or self._writes.get(), None
+            if item is None:
+                break
+            if _UNBATCHED.match(item[1]):
+                self._write_alone(conn, item)
+                continue
+            batch = [item]
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._writes.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._writes.put(None)  # stop after this batch
+                    break
+                if _UNBATCHED.match(item[1]):
+                    held = item
+                    break
+                batch.append(item)
+            self._write_batch(conn, batch)
+        conn.close()
+
+    def _write_alone(self, conn, item):
+        """Run a statement that cannot be part of a transaction, in autocommit mode."""
+        many, sql, params, future, loop = item
+        try:
+            cursor = conn.executemany(sql, params) if many else conn.execute(sql, params)
+            # A PRAGMA may return rows (PRAGMA journal_mode, table_info, ...)
+            result = cursor.fetchall() if cursor.description else cursor.rowcount
+            error = None
+        except Exception as e:
+            result, error = None, e
+        self.stats['writes'] += 1
+        self.stats['write_batches'] += 1
+        _deliver(loop, future, result, error)
+
+    def _write_batch(self, conn, batch):
+        results = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for many, sql, params, future, loop in batch:
+                conn.execute("SAVEPOINT request")
+                try:
+                    cursor = conn.executemany(sql, params) if many else conn.execute(sql, params)
+                    results.append((_rowcount(conn, cursor, sql), None))
+                    conn.execute("RELEASE request")
+                except Exception as e:  # also OverflowError, TypeError, ... from binding
+                    conn.execute("ROLLBACK TO request")
+                    conn.execute("RELEASE request")
+                    results.append((None, e))
+            conn.execute("COMMIT")
+        except Exception as e:
+            try:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+            except sqlite3.Error:
+                pass
+            results = [(None, e)] * len(batch)
+        self.stats['writes'] += len(batch)
+        self.stats['write_batches'] += 1
+        for (_, _, _, future, loop), (result, error) in zip(batch, results):
+            _deliver(loop, future, result, error)
+
+    def _reader(self):
+        conn = self._connect(read_only=True)
+        while True:
+            item = self._reads.get()
+            if item is None:
+                break
+            kind, job = item
+            if kind == 'fetch':
+                self.stats['reads'] += 1
+                sql, params, future, loop = job
+                try:
+                    _deliver(loop, future, conn.execute(sql, params).fetchall())
+                except Exception as e:
+                    if _is_with(sql) and _refused_write(e):
+                        self._writes.put((False, sql, params, future, loop))  # WITH ... DELETE etc.
+                    else:
+                        _deliver(loop, future, error=e)
+            elif kind == 'stream':
+                self._stream_batch(job)
+            else:
+                with job.lock:
+                    job.close()
+        conn.close()
+
+    def _stream_batch(self, state):
+        """Fetch the next batch of a stream; the consumer queues one job per batch."""
+        with state.lock:
+            if state.closed:
+                return
+            try:
+                if state.cursor is None:
+                    self.stats['reads'] += 1
+                    # The stream's jobs may run on any reader thread
+                    state.conn = self._connect(check_same_thread=False, read_only=True)
+                    state.cursor = state.conn.execute(state.sql, state.params)
+                rows = state.cursor.fetchmany(state.batch_size)
+            except Exception as e:
+                state.close()
+                state.send('error', e)
+                return
+            if rows:
+                state.send('rows', rows)
+            else:
+                state.close()
+                state.send('done')
+
+
+# ==============================================================================
+# Benchmark: event-loop latency under concurrent query load
+# ==============================================================================
+
+async def _measure_lag(stop, interval=0.005):
+    """How late the loop wakes up a task that asked to sleep `interval` seconds."""
+    lags = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+    return lags
+
+
+async def _run_load(read, write, clients=50, requests=40, write_every=4):
+    async def client(n):
+        for i in range(requests):
+            if i % write_every == 0:
+                await write("INSERT INTO events (user_id, kind) VALUES (?, ?)", (n, 'login'))
+            else:
+                await read("SELECT COUNT(*) FROM users WHERE email LIKE ?", (f"%{n}{i}@%",))
+
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_measure_lag(stop))
+    start = time.perf_counter()
+    async with asyncio.TaskGroup() as group:
+        for n in range(clients):
+            group.create_task(client(n))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    lags = sorted(await ticker) or [0.0]
+    return clients * requests / elapsed, lags
+
+
+def _create_database(path, users):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT NOT NULL, email TEXT NOT NULL UNIQUE)")
+    conn.execute("CREATE TABLE events (id INTEGER PRIMARY KEY, user_id INTEGER, kind TEXT)")
+    conn.executemany("INSERT INTO users (name, email) VALUES (?, ?)",
+                     ((f"user{i}", f"user{i}@example.com") for i in range(users)))
+    conn.commit()
+    conn.close()
+
+
+async def benchmark(users=20_000, clients=50, requests=40):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "async.db")
+        _create_database(path, users)
+
+        def report(name, throughput, lags):
+            print(f"{name:<28} {throughput:>10,.0f} {statistics.median(lags) * 1000:>9.2f} "
+                  f"{lags[int(len(lags) * 0.99)] * 1000:>9.2f} {lags[-1] * 1000:>9.2f}")
+
+        conn = sqlite3.connect(path)
+        conn.execute("PRAGMA synchronous=NORMAL")
+
+        async def blocking_read(sql, params):
+            return conn.execute(sql, params).fetchall()
+
+        async def blocking_write(sql, params):
+            conn.execute(sql, params)
+            conn.commit()
+
+        for mix, write_every in (("1 write per 3 reads", 4), ("writes only", 1)):
+            print(f"\n{clients} concurrent clients x {requests} requests, {mix}, {users:,} users")
+            print(f"{'':<28} {'requests/s':>10} {'lag p50':>9} {'lag p99':>9} {'lag max':>9}  (ms)")
+            # Blocking sqlite3 calls straight from the coroutines
+            report("sqlite3 in the event loop",
+                   *await _run_load(blocking_read, blocking_write, clients, requests, write_every))
+            for name, max_batch in (("AsyncDatabase, no batching", 1), ("AsyncDatabase", 256)):
+                async with AsyncDatabase(path, readers=2, max_batch=max_batch) as db:
+                    report(name, *await _run_load(db.execute, db.execute, clients, requests, write_every))
+                    stats = dict(db.stats)
+                print(f"{'':<28} {stats['writes']} writes in {stats['write_batches']} transactions")
+        conn.close()
+
+
+async def main():
+    # The sqlite_example() workflow from Access-DB.py, without blocking the loop
+    tmp = tempfile.TemporaryDirectory()
+    async with AsyncDatabase(os.path.join(tmp.name, 'example.db')) as db:
+        await db.execute('''
+            CREATE TABLE IF NOT EXISTS users (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                email TEXT NOT NULL UNIQUE
+            )
+        ''')
+        # Both inserts are queued together and share one transaction
+        await asyncio.gather(
+            db.execute("INSERT INTO users (name, email) VALUES (?, ?)", ('Alice', 'alice@example.com')),
+            db.execute("INSERT INTO users (name, email) VALUES (?, ?)", ('Bob', 'bob@example.com')),
+        )
+        try:
+            await db.execute("INSERT INTO users (name, email) VALUES (?, ?)", ('Alice', 'alice@example.com'))
+        except sqlite3.IntegrityError as e:
+            print(f"Duplicate rejected on its own: {e}")
+        async for user in db.stream("SELECT id, name, email FROM users"):
+            print(f"ID: {user[0]}, Name: {user[1]}, Email: {user[2]}")
+    tmp.cleanup()
+    await benchmark()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
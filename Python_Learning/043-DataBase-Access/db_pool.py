@@ -0,0 +1,252 @@
+"""
+SQLite Connection Pool
+
+sqlite_example() in Access-DB.py opens a new connection on every call and
+closes it at the end. Each connect opens the file, parses the schema and
+starts with a cold page cache, which costs far more than a simple query.
+A pool keeps connections open and lends them out.
+
+SQLite and threads:
+- By default a sqlite3 connection refuses to be used from any thread other
+  than the one that created it (check_same_thread=True).
+- The pool opens connections with check_same_thread=False, which is safe as
+  long as only one thread uses a connection at a time. The pool guarantees
+  that: a connection is lent to exactly one thread until it is returned.
+- If the SQLite library was built single-threaded (sqlite3.threadsafety == 0)
+  connections cannot move between threads at all, and the pool refuses to
+  start.
+"""
+
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+# Applied to every new connection. WAL lets readers work while a writer is
+# active; synchronous=NORMAL is safe with WAL and avoids an fsync per commit.
+# WAL is a property of the database file, not the connection: once a pool has
+# opened a file it stays in WAL mode (with -wal/-shm files next to it).
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'foreign_keys': 'ON',
+    'busy_timeout': 5000,
+}
+
+
+class PoolTimeout(sqlite3.OperationalError):
+    """No connection became free within the checkout timeout."""
+
+
+# ==============================================================================
+# The Pool
+# ==============================================================================
+
+class SQLitePool:
+    def __init__(self, database, size=5, timeout=5.0, pragmas=None, on_connect=None,
+                 health_check_after=30.0):
+        """
+        database:           path passed to sqlite3.connect()
+        size:               maximum number of open connections
+        timeout:            seconds acquire() waits for a free connection
+        pragmas:            PRAGMAs run on every new connection (DEFAULT_PRAGMAS).
+                            Note that journal_mode=WAL is stored in the
+                            database file: it stays in WAL mode after the
+                            pool is gone. Pass pragmas without it (or
+                            {**DEFAULT_PRAGMAS, 'journal_mode': 'DELETE'})
+                            to keep the file's rollback journal.
+        on_connect:         optional function(conn) run after the PRAGMAs
+        health_check_after: idle seconds after which a connection is checked
+                            with 'SELECT 1' before it is handed out
+        """
+        if sqlite3.threadsafety == 0:
+            raise sqlite3.NotSupportedError("this SQLite build cannot share connections between threads")
+        self.database = database
+        self.size = size
+        self.timeout = timeout
+        self.pragmas = DEFAULT_PRAGMAS if pragmas is None else pragmas
+        self.on_connect = on_connect
+        self.health_check_after = health_check_after
+        self._idle = []  # [(conn, returned_at)], used as a stack: reuses the warmest connection
+        self._lock = threading.Lock()
+        # Notified whenever an idle connection or a free slot may have appeared
+        self._available = threading.Condition(self._lock)
+        self._open = 0
+        self._closed = False
+        self.stats = {'created': 0, 'checkouts': 0, 'waits': 0, 'timeouts': 0, 'health_failures': 0}
+
+    def _connect(self):
+        conn = sqlite3.connect(self.database, check_same_thread=False)
+        try:
+            for name, value in self.pragmas.items():
+                conn.execute(f"PRAGMA {name}={value}")
+            if self.on_connect:
+                self.on_connect(conn)
+                conn.commit()
+        except BaseException:
+            conn.close()
+            raise
+        self.stats['created'] += 1
+        return conn
+
+    def _healthy(self, conn):
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def acquire(self):
+        """Borrow a connection; give it back with release()."""
+        if self._closed:
+            raise sqlite3.ProgrammingError("pool is closed")
+        self.stats['checkouts'] += 1
+        deadline = None
+        while True:
+            with self._available:
+                while not self._idle and self._open >= self.size:
+                    if self._closed:
+                        raise sqlite3.ProgrammingError("pool is closed")
+                    if deadline is None:
+                        self.stats['waits'] += 1
+                        deadline = time.monotonic() + self.timeout
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.stats['timeouts'] += 1
+                        raise PoolTimeout(f"no connection free after {self.timeout}s "
+                                          f"(pool size {self.size})")
+                    self._available.wait(remaining)
+                if self._idle:
+                    conn, returned_at = self._idle.pop()
+                else:
+                    self._open += 1
+                    conn = None
+
+            if conn is None:
+                try:
+                    return self._connect()
+                except BaseException:
+                    self._free_slot()
+                    raise
+            if time.monotonic() - returned_at < self.health_check_after or self._healthy(conn):
+                return conn
+            self.stats['health_failures'] += 1
+            self._discard(conn)
+
+    def release(self, conn):
+        """Return a connection. An unfinished transaction is rolled back."""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            self._discard(conn)
+            return
+        with self._available:
+            # Checked under the lock: close() may be draining _idle right now
+            if not self._closed:
+                self._idle.append((conn, time.monotonic()))
+                self._available.notify()
+                return
+        self._discard(conn)
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        self._free_slot()
+
+    def _free_slot(self):
+        # A waiter can now open a new connection in this slot
+        with self._available:
+            self._open -= 1
+            self._available.notify()
+
+    @contextmanager
+    def connection(self):
+        """
+        with pool.connection() as conn: ...
+        Commits when the block succeeds and rolls back when it raises,
+        like using a sqlite3 connection as a context manager.
+        """
+        conn = self.acquire()
+        try:
+            yield conn
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        finally:
+            self.release(conn)
+
+    def close(self):
+        """Close the idle connections; borrowed ones are closed as they come back."""
+        with self._available:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._available.notify_all()
+        for conn, _ in idle:
+            self._discard(conn)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ==============================================================================
+# Benchmark: connect-per-call vs. pooled connections
+# ==============================================================================
+
+def _create_users(path, rows=10_000):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT NOT NULL, email TEXT NOT NULL UNIQUE)")
+    conn.executemany("INSERT INTO users (name, email) VALUES (?, ?)",
+                     ((f"user{i}", f"user{i}@example.com") for i in range(rows)))
+    conn.commit()
+    conn.close()
+
+
+def benchmark(threads=4, queries_per_thread=2_000, rows=10_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        _create_users(path, rows)
+
+        def run(query):
+            def worker(seed):
+                for i in range(queries_per_thread):
+                    query((seed * 7919 + i) % rows + 1)
+
+            workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+            start = time.perf_counter()
+            for t in workers:
+                t.start()
+            for t in workers:
+                t.join()
+            return threads * queries_per_thread / (time.perf_counter() - start)
+
+        def connect_per_call(user_id):
+            conn = sqlite3.connect(path)
+            try:
+                conn.execute("SELECT name, email FROM users WHERE id = ?", (user_id,)).fetchone()
+            finally:
+                conn.close()
+
+        pool = SQLitePool(path, size=threads)
+
+        def pooled(user_id):
+            with pool.connection() as conn:
+                conn.execute("SELECT name, email FROM users WHERE id = ?", (user_id,)).fetchone()
+
+        print(f"{threads} threads, {queries_per_thread:,} primary-key lookups each")
+        print(f"connect per call : {run(connect_per_call):>10,.0f} queries/s")
+        print(f"SQLitePool({threads})    : {run(pooled):>10,.0f} queries/s")
+        print(f"pool stats: {pool.stats}")
+        pool.close()
+
+
+if __name__ == '__main__':
+    benchmark()
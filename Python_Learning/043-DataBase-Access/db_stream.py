@@ -0,0 +1,200 @@
+"""
+Streaming Query Results
+
+cursor.fetchall() builds a list of every row before the first one can be
+used, so memory grows with the size of the result. Streaming keeps only one
+batch of rows in memory at a time:
+
+- stream() / stream_batches() read the result with cursor.fetchmany(n).
+- namedtuple_factory and dataclass_factory(cls) turn rows into objects with
+  named fields instead of plain tuples.
+- keyset_pages() walks a very large table in pages using the last key seen
+  ("WHERE id > ? ORDER BY id LIMIT n"). Unlike LIMIT/OFFSET, every page is an
+  index seek, so the last page is as fast as the first, and no read
+  transaction is held open between pages.
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields
+
+
+# ==============================================================================
+# Row Factories
+# ==============================================================================
+
+_namedtuple_types = {}
+
+
+def namedtuple_factory(cursor, row):
+    """cursor.row_factory that returns namedtuples named after the columns."""
+    columns = tuple(d[0] for d in cursor.description)
+    cls = _namedtuple_types.get(columns)
+    if cls is None:
+        cls = _namedtuple_types[columns] = namedtuple("Row", columns, rename=True)
+    return cls._make(row)
+
+
+def dataclass_factory(cls):
+    """
+    A cursor.row_factory that builds `cls` instances. Columns are matched to
+    the dataclass fields by name; columns without a field are ignored.
+    """
+    names = {f.name for f in fields(cls)}
+    cache = {}  # cursor.description -> [(field name, column index)]
+
+    def factory(cursor, row):
+        description = cursor.description
+        mapping = cache.get(description)
+        if mapping is None:
+            mapping = cache[description] = [(d[0], i) for i, d in enumerate(description) if d[0] in names]
+        return cls(**{name: row[i] for name, i in mapping})
+    return factory
+
+
+# ==============================================================================
+# Streaming
+# ==============================================================================
+
+def stream_batches(conn, sql, params=(), batch_size=1000, row_factory=None):
+    """Yield lists of up to `batch_size` rows from the query."""
+    cursor = conn.cursor()
+    if row_factory is not None:
+        cursor.row_factory = row_factory
+    try:
+        cursor.execute(sql, params)
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                return
+            yield batch
+    finally:
+        cursor.close()
+
+
+def stream(conn, sql, params=(), batch_size=1000, row_factory=None):
+    """Yield the rows of the query one at a time, fetched `batch_size` at a time."""
+    for batch in stream_batches(conn, sql, params, batch_size, row_factory):
+        yield from batch
+
+
+def _quote(identifier):
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def keyset_pages(conn, table, key='id', columns=('*',), page_size=1000, where=None, params=(),
+                 row_factory=None):
+    """
+    Yield pages (lists of rows) of `table` in `key` order. `key` must be
+    unique and indexed (the primary key is ideal), and must be among the
+    selected columns. `where` is an optional extra condition, e.g.
+    "name LIKE ?" with params=('A%',).
+    """
+    select = f"SELECT {', '.join(c if c == '*' else _quote(c) for c in columns)} FROM {_quote(table)}"
+    order = f" ORDER BY {_quote(key)} LIMIT ?"
+    extra = f" AND ({where})" if where else ""
+    first_page = select + (f" WHERE {where}" if where else "") + order
+    next_page = select + f" WHERE {_quote(key)} > ?" + extra + order
+
+    cursor = conn.cursor()
+    try:
+        rows = cursor.execute(first_page, (*params, page_size)).fetchall()
+        position = [d[0] for d in cursor.description].index(key)
+        while rows:
+            last = rows[-1][position]
+            if row_factory is not None:
+                rows = [row_factory(cursor, row) for row in rows]
+            yield rows
+            rows = cursor.execute(next_page, (last, *params, page_size)).fetchall()
+    finally:
+        cursor.close()
+
+
+def keyset_rows(conn, table, key='id', columns=('*',), page_size=1000, where=None, params=(),
+                row_factory=None):
+    """Like keyset_pages(), one row at a time."""
+    for page in keyset_pages(conn, table, key, columns, page_size, where, params, row_factory):
+        yield from page
+
+
+# ==============================================================================
+# Benchmark: peak memory of a full-table scan
+# ==============================================================================
+
+@dataclass
+class User:
+    id: int
+    name: str
+    email: str
+
+
+def _peak_rss_mb():
+    """Peak resident memory of this process in MB, or None where unknown."""
+    try:
+        import resource  # Unix only; the streaming API above works everywhere
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+
+def _scan(path, method):
+    """Runs in a fresh process, so the peak RSS belongs to this scan alone."""
+    conn = sqlite3.connect(path)
+    before = _peak_rss_mb()
+    start = time.perf_counter()
+    count = 0
+    if method == 'fetchall':
+        for _ in conn.execute("SELECT id, name, email FROM users").fetchall():
+            count += 1
+    elif method == 'stream':
+        for _ in stream(conn, "SELECT id, name, email FROM users"):
+            count += 1
+    elif method == 'stream + dataclass':
+        for _ in stream(conn, "SELECT id, name, email FROM users", row_factory=dataclass_factory(User)):
+            count += 1
+    elif method == 'keyset pages':
+        for _ in keyset_rows(conn, "users", columns=("id", "name", "email")):
+            count += 1
+    elapsed = time.perf_counter() - start
+    conn.close()
+    after = _peak_rss_mb()
+    return count, elapsed, None if before is None else after - before
+
+
+def benchmark(rows=1_000_000):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "scan.db")
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT NOT NULL, email TEXT NOT NULL)")
+        conn.executemany("INSERT INTO users (name, email) VALUES (?, ?)",
+                         ((f"user{i}", f"user{i}@example.com") for i in range(rows)))
+        conn.commit()
+        conn.close()
+
+        print(f"Full scan of {rows:,} rows")
+        print(f"{'method':<20} {'seconds':>8} {'peak RSS growth':>16}")
+        for method in ('fetchall', 'stream', 'stream + dataclass', 'keyset pages'):
+            with ProcessPoolExecutor(max_workers=1) as pool:
+                count, elapsed, grew = pool.submit(_scan, path, method).result()
+            assert count == rows
+            memory = f"{grew:13.1f} MB" if grew is not None else f"{'n/a':>16}"
+            print(f"{method:<20} {elapsed:8.2f} {memory}")
+
+
+if __name__ == '__main__':
+    conn = sqlite3.connect(':memory:')
+    conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT NOT NULL, email TEXT NOT NULL)")
+    conn.executemany("INSERT INTO users (name, email) VALUES (?, ?)",
+                     [('Alice', 'alice@example.com'), ('Bob', 'bob@example.com'), ('Carol', 'carol@example.com')])
+    for user in stream(conn, "SELECT id, name, email FROM users", row_factory=namedtuple_factory):
+        print(f"ID: {user.id}, Name: {user.name}, Email: {user.email}")
+    for page in keyset_pages(conn, "users", page_size=2, row_factory=dataclass_factory(User)):
+        print("page:", page)
+    conn.close()
+    print()
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
@@ -0,0 +1,310 @@
+"""
+Query Result Cache
+
+When the same SELECTs with the same parameters arrive again and again
+(looking up the same users, the same settings), every one of them still
+parses, plans and runs in SQLite. CachedDatabase keeps recent results:
+
+- The key is the normalized SQL (whitespace and keyword case do not matter,
+  string literals are kept as they are) plus the bound parameters.
+- LRU: at most `max_entries` results; the least recently used goes first.
+- TTL: an entry older than `ttl` seconds is not served.
+- Table-level invalidation: every cached result remembers the tables its
+  query reads. A write through execute()/executemany() drops the cached
+  results of the tables it changes. A write that can change other tables as
+  well (the table has triggers or takes part in a foreign key, which may
+  cascade) clears the whole cache, and so does a statement whose target
+  table cannot be determined; likewise, a query whose
+  tables cannot all be determined (a subquery or table function in FROM, a
+  comma list after a JOIN) is dropped by any write.
+
+Only writes made through this object are seen. Another process (or code
+that uses the connection directly) can change the data behind the cache's
+back; the TTL bounds how stale such a result can get. A query on a view is
+invalidated by writes to the view's name only, not to the tables behind it.
+"""
+
+import os
+import random
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+
+_LITERAL = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")")  # strings and quoted names
+_SPACE = re.compile(r'\s+')
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NAME = r'(?:\w+\.)?("(?:[^"]|"")+"|\w+)'  # optional schema prefix, then the table
+# A FROM list "users u, orders AS o INDEXED BY idx": names with optional
+# aliases (which are never keywords) and index hints, separated by commas.
+_ALIAS = (r'(?:\s+(?:as\s+)?(?!(?:where|join|inner|left|right|full|cross|natural|outer|on|using'
+          r'|group|order|limit|having|window|union|intersect|except|indexed|not)\b)\w+)?'
+          r'(?:\s+indexed\s+by\s+\w+|\s+not\s+indexed)?')
+_READ_TABLES = re.compile(r'\b(?:from|join)\s+(?P<list>' + _NAME + _ALIAS
+                          + r'(?:\s*,\s*' + _NAME + _ALIAS + r')*)')
+_LIST_ITEM = re.compile(_NAME + _ALIAS)
+_UNSURE_TABLES = re.compile(r'\b(?:from|join)\s*\(|\b(?:from|join)\s+' + _NAME + r'\s*\(|\bjoin\b.*,',
+                            re.DOTALL)
+_ANY_TABLE = frozenset([None])  # invalidated by a write to any table
+_WRITE_TABLE = re.compile(
+    r'^\s*(?:with\b.*?\)\s*)?'
+    r'(?:insert(?:\s+or\s+\w+)?\s+into|replace\s+into|update(?:\s+or\s+\w+)?|delete\s+from'
+    r'|(?:create|drop|alter)\s+table(?:\s+if\s+(?:not\s+)?exists)?)\s+' + _NAME,
+    re.DOTALL)
+
+
+@lru_cache(maxsize=4096)
+def normalize_sql(sql):
+    """Collapse whitespace and lower-case everything outside string literals."""
+    parts = _LITERAL.split(sql.strip().rstrip(';').strip())
+    return ''.join(part if i % 2 else _SPACE.sub(' ', part).lower() for i, part in enumerate(parts))
+
+
+def _table_name(token):
+    name = token[1:-1].replace('""', '"') if token.startswith('"') else token
+    return name.lower()
+
+
+@lru_cache(maxsize=4096)
+def read_tables(normalized):
+    """The tables a query reads, or None if they cannot all be told."""
+    sql = _STRING.sub("''", normalized)
+    if _UNSURE_TABLES.search(sql):
+        return None
+    return frozenset(_table_name(name)
+                     for match in _READ_TABLES.finditer(sql)
+                     for name in _LIST_ITEM.findall(match.group('list')))
+
+
+@lru_cache(maxsize=4096)
+def written_table(normalized):
+    """The table a write statement changes, or None if it cannot be told."""
+    match = _WRITE_TABLE.match(_STRING.sub("''", normalized))
+    return _table_name(match.group(1)) if match else None
+
+
+def _param_key(params):
+    # 1, 1.0 and True are equal and hash alike, but SQLite treats them
+    # differently ("SELECT ?" returns 1 or 1.0): the type is part of the key.
+    if isinstance(params, dict):
+        return tuple(sorted((name, type(value), value) for name, value in params.items()))
+    return tuple((type(value), value) for value in params)
+
+
+# ==============================================================================
+# The Cache
+# ==============================================================================
+
+class CachedDatabase:
+    def __init__(self, source, max_entries=1024, ttl=60.0):
+        """
+        source: a sqlite3 connection, or a db_pool.SQLitePool (anything with
+                a connection() context manager).
+        """
+        self.source = source
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, rows, tables)
+        self._by_table = {}  # table -> set of keys that read it; None -> keys with unknown tables
+        self._lock = threading.Lock()
+        self._generation = 0  # bumped by every invalidation
+        self._schema_version = None
+        self._side_effects = {}  # table -> can a write to it change other tables?
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0, 'invalidations': 0}
+
+    @contextmanager
+    def _connection(self):
+        if hasattr(self.source, 'connection'):
+            with self.source.connection() as conn:
+                yield conn
+        else:
+            yield self.source
+
+    # ---- reads -----------------------------------------------------------
+
+    def query(self, sql, params=()):
+        """Run a SELECT, or serve its rows from the cache. Returns a list of rows."""
+        normalized = normalize_sql(sql)
+        key = (normalized, _param_key(params))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return list(entry[1])
+                self._remove(key)
+                self.stats['expired'] += 1
+            self.stats['misses'] += 1
+            generation = self._generation
+
+        with self._connection() as conn:
+            rows = tuple(conn.execute(sql, params).fetchall())
+
+        with self._lock:
+            # A write that finished while the query ran may have made `rows`
+            # stale; only cache if nothing was invalidated in between.
+            if generation == self._generation:
+                tables = read_tables(normalized)
+                self._store(key, rows, _ANY_TABLE if tables is None else tables)
+        return list(rows)
+
+    def _store(self, key, rows, tables):
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (time.monotonic() + self.ttl, rows, tables)
+        for table in tables:
+            self._by_table.setdefault(table, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            self.stats['evictions'] += 1
+
+    def _remove(self, key):
+        _, _, tables = self._entries.pop(key)
+        for table in tables:
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_table[table]
+
+    # ---- writes ----------------------------------------------------------
+
+    def execute(self, sql, params=()):
+        """
+        Run a write statement, commit, and invalidate the affected table.
+        Use query() for SELECTs: execute() treats every statement as a write.
+        """
+        with self._connection() as conn:
+            cursor = conn.execute(sql, params)
+            conn.commit()
+            table = self._invalidated_table(conn, sql)
+        self.invalidate(table)
+        return cursor.rowcount
+
+    def executemany(self, sql, seq_of_params):
+        with self._connection() as conn:
+            cursor = conn.executemany(sql, seq_of_params)
+            conn.commit()
+            table = self._invalidated_table(conn, sql)
+        self.invalidate(table)
+        return cursor.rowcount
+
+    def _invalidated_table(self, conn, sql):
+        """The table to invalidate after `sql`, or None for the whole cache."""
+        table = written_table(normalize_sql(sql))
+        if table is None or self._has_side_effects(conn, table):
+            return None
+        return table
+
+    def _has_side_effects(self, conn, table):
+        """
+        Can a write to `table` change other tables? True if it has triggers
+        or takes part in a foreign key (ON DELETE CASCADE and friends). The
+        answers are kept until the schema changes.
+        """
+        version = conn.execute("PRAGMA schema_version").fetchone()[0]
+        with self._lock:
+            if version != self._schema_version:
+                self._schema_version = version
+                self._side_effects.clear()
+            known = self._side_effects.get(table)
+        if known is None:
+            known = conn.execute(
+                "SELECT EXISTS (SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND lower(tbl_name) = ?"
+                " UNION ALL SELECT 1 FROM sqlite_temp_master WHERE type = 'trigger' AND lower(tbl_name) = ?"
+                " UNION ALL SELECT 1 FROM sqlite_master AS m, pragma_foreign_key_list(m.name) AS fk"
+                " WHERE m.type = 'table' AND (lower(m.name) = ? OR lower(fk.\"table\") = ?))",
+                (table,) * 4).fetchone()[0] == 1
+            with self._lock:
+                self._side_effects[table] = known
+        return known
+
+    def invalidate(self, table=None):
+        """Drop cached results that read `table`; table=None clears everything."""
+        with self._lock:
+            self._generation += 1
+            if table is None:
+                dropped = len(self._entries)
+                self._entries.clear()
+                self._by_table.clear()
+            else:
+                keys = self._by_table.pop(table.lower(), set()) | self._by_table.pop(None, set())
+                dropped = len(keys)
+                for key in keys:
+                    self._remove(key)
+            self.stats['invalidations'] += dropped
+
+    def metrics(self):
+        with self._lock:
+            stats = dict(self.stats, entries=len(self._entries))
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+
+# ==============================================================================
+# Benchmark: repetitive lookups with occasional writes
+# ==============================================================================
+
+def benchmark(users=10_000, operations=100_000, write_ratios=(0.0, 0.001, 0.01), hot_users=500):
+    """
+    90% of lookups go to `hot_users` popular users, the rest anywhere; the
+    writes UPDATE random users, so each one invalidates the whole table.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "cache.db")
+        conn = sqlite3.connect(path)
+        conn.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT NOT NULL, email TEXT NOT NULL UNIQUE)")
+        conn.executemany("INSERT INTO users (name, email) VALUES (?, ?)",
+                         ((f"user{i}", f"user{i}@example.com") for i in range(users)))
+        conn.commit()
+
+        def run(ops, read, write):
+            start = time.perf_counter()
+            for is_write, user_id in ops:
+                if is_write:
+                    write("UPDATE users SET name = ? WHERE id = ?", (f"renamed{user_id}", user_id))
+                else:
+                    read("SELECT id, name, email FROM users WHERE id = ?", (user_id,))
+            return operations / (time.perf_counter() - start)
+
+        def direct_read(sql, params):
+            return conn.execute(sql, params).fetchall()
+
+        def direct_write(sql, params):
+            conn.execute(sql, params)
+            conn.commit()
+
+        print(f"{operations:,} operations, 90% of reads on {hot_users} of {users:,} users")
+        print(f"{'writes':>7} {'uncached ops/s':>15} {'cached ops/s':>13} {'hit rate':>9}")
+        for write_ratio in write_ratios:
+            rnd = random.Random(42)
+            ops = [(rnd.random() < write_ratio,
+                    rnd.randint(1, hot_users) if rnd.random() < 0.9 else rnd.randint(1, users))
+                   for _ in range(operations)]
+            uncached = run(ops, direct_read, direct_write)
+            db = CachedDatabase(conn, max_entries=2000, ttl=60)
+            cached = run(ops, db.query, db.execute)
+            print(f"{write_ratio:>7.1%} {uncached:>15,.0f} {cached:>13,.0f} {db.metrics()['hit_rate']:>9.1%}")
+        conn.close()
+
+
+if __name__ == '__main__':
+    conn = sqlite3.connect(':memory:')
+    db = CachedDatabase(conn)
+    db.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT NOT NULL, email TEXT NOT NULL UNIQUE)")
+    db.executemany("INSERT INTO users (name, email) VALUES (?, ?)",
+                   [('Alice', 'alice@example.com'), ('Bob', 'bob@example.com')])
+    print(db.query("SELECT name FROM users WHERE id = ?", (1,)))
+    print(db.query("select   name from USERS where id = ?", (1,)), "<- same key, served from the cache")
+    db.execute("UPDATE users SET name = ? WHERE id = ?", ('Alicia', 1))
+    print(db.query("SELECT name FROM users WHERE id = ?", (1,)), "<- invalidated by the UPDATE")
+    print(db.metrics())
+    print()
+    benchmark()